@@ -8,6 +8,62 @@ HEARTBEAT_TIMEOUT = 5.0
 ELECTION_TIMEOUT = 3.0
 REQUEST_TIMEOUT = 2.0
 
+# Timeouts adaptativos (estilo RTO do TCP): o timeout de cada peer e
+# srtt + K * rttvar medidos nos heartbeats, limitado por piso e teto. Os
+# valores fixos acima valem ate RTO_MIN_SAMPLES amostras do peer e com
+# ADAPTIVE_TIMEOUTS = False
+ADAPTIVE_TIMEOUTS = True
+RTO_MIN_SAMPLES = 3
+RTT_VARIANCE_SMOOTHING = 0.25
+RTO_VARIANCE_FACTOR = 4
+REQUEST_TIMEOUT_MIN = 0.5
+REQUEST_TIMEOUT_MAX = 5.0
+# Espera pelo anuncio do vencedor: ELECTION_TIMEOUT_FACTOR x maior RTO dos candidatos
+ELECTION_TIMEOUT_FACTOR = 3
+ELECTION_TIMEOUT_MIN = 1.0
+ELECTION_TIMEOUT_MAX = 30.0
+
+# Modo de eleicao: "bully" (classico) ou "fast" (bully modificado,
+# contata primeiro o peer vivo de maior power conhecido)
+ELECTION_MODE = "bully"
+
 # Power Score
 MIN_POWER_SCORE = 10
 MAX_POWER_SCORE = 100
+
+# Power score medido: "static" (aleatorio/manual) ou "measured" (CPU,
+# carga, memoria livre e uptime lidos de /proc)
+POWER_MODE = "static"
+POWER_SAMPLE_INTERVAL = 5.0
+POWER_SMOOTHING = 0.3
+# Capacidade bruta (10/CPU livre + 5/GB livre + horas de uptime) que vale o
+# meio da faixa [MIN_POWER_SCORE, MAX_POWER_SCORE]: a escala satura sem cortar
+POWER_REFERENCE = 200.0
+
+# Histerese: so ha reeleicao se um no superar o coordenador pela margem
+# (fracao) durante todo o periodo (segundos)
+POWER_HYSTERESIS_MARGIN = 0.2
+POWER_HYSTERESIS_PERIOD = 30.0
+
+# Suavizacao do RTT medido nos heartbeats (coordenadas Vivaldi e srtt do RTO)
+RTT_SMOOTHING = 0.2
+
+# Sequencia global de IDs: o coordenador empresta blocos e cada no serve
+# IDs localmente, buscando o proximo bloco quando resta prefetch_ratio do atual
+ID_BLOCK_SIZE = 10000
+ID_PREFETCH_RATIO = 0.25
+ID_RESERVATION_SIZE = 1000000
+ID_FETCH_TIMEOUT = 5.0
+ID_MAX_REQUEST = 100000
+
+# Endpoint /status
+STATUS_DEFAULT_PAGE_SIZE = 100
+STATUS_MAX_PAGE_SIZE = 1000
+
+# Snapshot de estado em disco (reinicio rapido)
+STATE_DIR = ".state"
+SNAPSHOT_MAX_AGE = 300.0
+
+# Inicializacao
+HEARTBEAT_WORKERS = 16
+STARTUP_WAIT_TIMEOUT = 5.0
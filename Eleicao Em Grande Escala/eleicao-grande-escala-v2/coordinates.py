@@ -0,0 +1,264 @@
+# Copia gerada por sync_shared.py a partir de eleicao-grande-escala/coordinates.py (sha256 ae17e2e4bf7b24114ec08eecb577d834e6195b15f35915bf401952c44f89ddf7) - nao edite
+"""
+coordinates.py - Coordenadas de rede (Vivaldi) e agrupamento por latência
+
+Cada nó mantém uma coordenada sintética (vetor euclidiano + altura) ajustada
+a partir dos RTTs medidos com outros nós, de modo que a distância entre duas
+coordenadas estime o RTT entre eles sem medir todos os pares. O módulo é
+usado pelo simulador (latência simulada) e pelo nó HTTP da v2 (RTT dos
+heartbeats).
+
+Também oferece um agrupamento com capacidade (k-means sobre as coordenadas,
+grupos de tamanho fixo) para formar grupos de nós próximos entre si.
+
+Referência: Dabek et al., "Vivaldi: A Decentralized Network Coordinate System" (2004)
+"""
+
+import heapq
+import math
+import random
+from typing import Dict, Hashable, List, Optional, Sequence
+
+
+DIMENSIONS = 2
+CE = 0.25           # peso do ajuste do erro local
+CC = 0.25           # passo do ajuste da coordenada
+MIN_HEIGHT = 0.1    # altura mínima (ms)
+INITIAL_ERROR = 1.0
+NEAREST_CENTERS = 8  # centros candidatos mantidos por nó no agrupamento
+
+
+class VivaldiCoordinate:
+    """
+    Coordenada Vivaldi com altura (modela o enlace de acesso do nó).
+    
+    Attributes:
+        vector: Posição euclidiana (ms)
+        height: Altura, somada às distâncias (ms)
+        error: Erro relativo estimado da coordenada (0 = exata, 1 = desconhecida)
+        updates: Quantidade de amostras de RTT incorporadas
+    """
+    
+    def __init__(self, dimensions: int = DIMENSIONS, rng: Optional[random.Random] = None):
+        self.vector: List[float] = [0.0] * dimensions
+        self.height = MIN_HEIGHT
+        self.error = INITIAL_ERROR
+        self.updates = 0
+        self._rng = rng or random.Random()
+    
+    def distance_to(self, other: "VivaldiCoordinate") -> float:
+        """RTT estimado (ms) até a coordenada other."""
+        return math.dist(self.vector, other.vector) + self.height + other.height
+    
+    def update(self, rtt_ms: float, other: "VivaldiCoordinate") -> None:
+        """
+        Incorpora uma amostra de RTT medida até o nó dono de other.
+        
+        Args:
+            rtt_ms: RTT medido (ms)
+            other: Coordenada atual do nó remoto
+        """
+        if rtt_ms <= 0:
+            return
+        
+        estimate = self.distance_to(other)
+        weight = self.error / (self.error + other.error) if self.error + other.error > 0 else 0.5
+        sample_error = abs(estimate - rtt_ms) / rtt_ms
+        self.error = min(INITIAL_ERROR, sample_error * CE * weight + self.error * (1 - CE * weight))
+        
+        # Força de mola: afasta se o RTT real é maior que o estimado, aproxima se menor
+        force = CC * weight * (rtt_ms - estimate)
+        diff = [a - b for a, b in zip(self.vector, other.vector)]
+        norm = math.hypot(*diff)
+        if norm == 0:
+            # Coordenadas coincidentes: direção aleatória
+            diff = [self._rng.uniform(-1, 1) for _ in self.vector]
+            norm = math.hypot(*diff) or 1.0
+        self.vector = [v + force * d / norm for v, d in zip(self.vector, diff)]
+        self.height = max(MIN_HEIGHT, self.height + force * self.height / max(estimate, MIN_HEIGHT))
+        self.updates += 1
+    
+    def to_dict(self) -> dict:
+        """Representação serializável (enviada no /heartbeat da v2)."""
+        return {
+            "vector": [round(v, 3) for v in self.vector],
+            "height": round(self.height, 3),
+            "error": round(self.error, 4)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "VivaldiCoordinate":
+        """Reconstrói uma coordenada recebida de outro nó."""
+        coordinate = cls(len(data["vector"]))
+        coordinate.vector = [float(v) for v in data["vector"]]
+        coordinate.height = float(data.get("height", MIN_HEIGHT))
+        coordinate.error = float(data.get("error", INITIAL_ERROR))
+        return coordinate
+
+
+def _centroid(points: Sequence[List[float]]) -> List[float]:
+    return [sum(axis) / len(points) for axis in zip(*points)]
+
+
+class _Grid:
+    """
+    Índice espacial por células quadradas sobre os dois primeiros eixos.
+    
+    A distância projetada nesses eixos nunca é maior que a distância real,
+    então os limites usados nas buscas valem para qualquer dimensão.
+    """
+    
+    def __init__(self, points: List[Sequence[float]], per_cell: int):
+        self.points = points
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        span = max(max(xs) - min(xs), max(ys) - min(ys))
+        self.cell = span / max(1, math.ceil(math.sqrt(len(points) / per_cell))) or 1.0
+        self.cells: Dict[tuple, List[int]] = {}
+        for index, point in enumerate(points):
+            self.cells.setdefault(self._key(point), []).append(index)
+        keys = list(self.cells)
+        self.bounds = (min(k[0] for k in keys), max(k[0] for k in keys),
+                       min(k[1] for k in keys), max(k[1] for k in keys))
+    
+    def _key(self, point: Sequence[float]) -> tuple:
+        return math.floor(point[0] / self.cell), math.floor(point[1] / self.cell)
+    
+    def _ring(self, key: tuple, r: int):
+        """Índices nas células a exatamente r células (Chebyshev) de key."""
+        x, y = key
+        if r == 0:
+            cells = [(x, y)]
+        else:
+            cells = [(x + dx, y + dy) for dx in range(-r, r + 1) for dy in (-r, r)]
+            cells += [(x + dx, y + dy) for dx in (-r, r) for dy in range(-r + 1, r)]
+        for cell in cells:
+            yield from self.cells.get(cell, ())
+    
+    def nearest(self, point: Sequence[float], count: int, accept=None) -> List[tuple]:
+        """
+        Os count pontos (aceitos por accept) mais próximos de point.
+        
+        Returns:
+            Pares (distância, índice) do mais distante ao mais próximo
+        """
+        key = self._key(point)
+        x0, x1, y0, y1 = self.bounds
+        last = max(key[0] - x0, x1 - key[0], key[1] - y0, y1 - key[1])
+        best: List[tuple] = []  # heap de máximo via (-distância, -índice)
+        r = 0
+        while r <= last:
+            for index in self._ring(key, r):
+                if accept is not None and not accept(index):
+                    continue
+                entry = (-math.dist(point, self.points[index]), -index)
+                if len(best) < count:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            # Células além do anel r ficam a mais de r * cell de point
+            if len(best) >= count and -best[0][0] < r * self.cell:
+                break
+            r += 1
+        return sorted(((-d, -i) for d, i in best), reverse=True)
+    
+    def within(self, point: Sequence[float], radius: float):
+        """Índices nas células que cruzam o quadrado de lado 2·radius em volta de point."""
+        x0, x1, y0, y1 = self.bounds
+        (ax, ay), (bx, by) = self._key([point[0] - radius, point[1] - radius]), \
+            self._key([point[0] + radius, point[1] + radius])
+        for x in range(max(ax, x0), min(bx, x1) + 1):
+            for y in range(max(ay, y0), min(by, y1) + 1):
+                yield from self.cells.get((x, y), ())
+
+
+def _assign_with_capacity(points: List[Sequence[float]], centers: List[List[float]],
+                          group_size: int) -> List[List[int]]:
+    """Atribuição gulosa (nó, centro) por distância crescente respeitando a capacidade."""
+    groups: List[List[int]] = [[] for _ in centers]
+    grid = _Grid(centers, per_cell=2)
+    is_open = lambda index: len(groups[index]) < group_size
+    pending = [grid.nearest(p, NEAREST_CENTERS) for p in points]
+    heap = []
+    for position, nearest in enumerate(pending):
+        distance, index = nearest.pop()
+        heap.append((distance, index, position))
+    heapq.heapify(heap)
+    
+    while heap:
+        distance, index, position = heapq.heappop(heap)
+        if is_open(index):
+            groups[index].append(position)
+            pending[position] = None
+            continue
+        # Centro lotado: próximo candidato do nó; esgotados, busca entre os
+        # centros ainda abertos (centros nunca reabrem, então a ordem se mantém)
+        nearest = pending[position]
+        if not nearest:
+            nearest = pending[position] = grid.nearest(points[position], NEAREST_CENTERS, is_open)
+        distance, index = nearest.pop()
+        heapq.heappush(heap, (distance, index, position))
+    return groups
+
+
+def cluster_by_coordinates(coordinates: Dict[Hashable, VivaldiCoordinate], num_groups: int,
+                           group_size: int, seed: int = 0, iterations: int = 5) -> List[List[Hashable]]:
+    """
+    Agrupa nós próximos em grupos de tamanho fixo (k-means com capacidade).
+    
+    Os centros são iniciados por k-means++ e, a cada iteração, os pares
+    (nó, centro) são atribuídos do mais próximo ao mais distante respeitando
+    a capacidade de cada grupo; os centros passam a ser os centróides.
+    
+    Cada nó guarda só os NEAREST_CENTERS centros mais próximos (buscados em
+    uma grade de células), intercalados por um heap; quando todos lotam, o nó
+    busca os próximos entre os centros ainda abertos. A ordem é a mesma da
+    lista completa de pares, com memória O(N) em vez de O(N·K).
+    
+    Args:
+        coordinates: Coordenada de cada nó
+        num_groups: Quantidade de grupos
+        group_size: Capacidade de cada grupo
+        seed: Semente da inicialização dos centros
+        iterations: Rodadas de reatribuição
+    
+    Returns:
+        Lista de grupos (listas de chaves de coordinates)
+    """
+    keys = list(coordinates)
+    if num_groups * group_size < len(keys):
+        raise ValueError("Capacidade total dos grupos menor que a quantidade de nós")
+    if not keys:
+        return [[] for _ in range(num_groups)]
+    
+    rng = random.Random(seed)
+    points = {k: coordinates[k].vector for k in keys}
+    
+    # k-means++: cada novo centro é sorteado com peso proporcional à distância²
+    # até o centro mais próximo. O peso é mantido incrementalmente e só os nós
+    # a menos de sqrt(maior peso) do novo centro podem mudar
+    vectors = [points[k] for k in keys]
+    grid = _Grid(vectors, per_cell=8)
+    centers = [list(points[rng.choice(keys)])]
+    weights = [math.dist(v, centers[0]) ** 2 for v in vectors]
+    while len(centers) < num_groups:
+        if sum(weights) == 0:
+            center = list(points[rng.choice(keys)])
+        else:
+            center = list(points[rng.choices(keys, weights)[0]])
+        centers.append(center)
+        radius = math.sqrt(max(weights)) * (1 + 1e-9)
+        for position in grid.within(center, radius):
+            weight = math.dist(vectors[position], center) ** 2
+            if weight < weights[position]:
+                weights[position] = weight
+    
+    groups: List[List[Hashable]] = []
+    for _ in range(iterations):
+        groups = _assign_with_capacity(vectors, centers, group_size)
+        groups = [[keys[position] for position in group] for group in groups]
+        new_centers = [_centroid([points[k] for k in g]) if g else c for g, c in zip(groups, centers)]
+        if new_centers == centers:
+            break
+        centers = new_centers
+    return groups
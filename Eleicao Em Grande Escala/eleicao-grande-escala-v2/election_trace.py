@@ -0,0 +1,383 @@
+# Copia gerada por sync_shared.py a partir de eleicao-grande-escala/election_trace.py (sha256 10bbc1e083e555beab01e65e513d5544172fdecf80d70bf69e1c83a3e6d49159) - nao edite
+"""
+election_trace.py - Gravação binária e replay determinístico de eleições
+
+Este módulo grava os eventos de uma execução (simulador ou nó HTTP da v2)
+em registros binários de tamanho fixo em um arquivo mapeado em memória
+(mmap), com custo muito baixo por evento, e permite reexecutar o trace
+pelo núcleo do algoritmo de forma determinística.
+
+Formato do arquivo:
+- Cabeçalho de 16 bytes: magic "ELTR", versão e quantidade de registros
+- Registros de 24 bytes: tipo, papel, origem, destino, power e timestamp
+- Arquivo auxiliar <trace>.ids com um node_id por linha (índice = id numérico)
+
+Uso pela linha de comando:
+    python election_trace.py dump trace.bin
+    python election_trace.py replay trace.bin
+    python election_trace.py check
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+
+MAGIC = b"ELTR"
+VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)  # a versão 1 não tinha o papel (byte de preenchimento zerado)
+HEADER = struct.Struct("<4sHxxQ")
+RECORD = struct.Struct("<BBxxIIid")
+NO_NODE = 0xFFFFFFFF
+
+# Tipos de evento
+MEMBER = 1        # participante conhecido (src) com seu power
+ELECTION = 2      # src → dst
+OK = 3            # src → dst
+COORDINATOR = 4   # anúncio do coordenador src recebido por dst
+ELECTED = 5       # src venceu a eleição
+START = 6         # src iniciou uma eleição
+FAIL = 7          # src falhou (ou foi detectado como falho)
+RECOVER = 8       # src voltou a responder
+
+# Papel do participante nos eventos MEMBER
+ROLE_UNKNOWN = 0    # não informado (traces da versão 1): tratado como candidato
+ROLE_CANDIDATE = 1  # participa da eleição global (superpeer, ou qualquer nó no modo plano)
+ROLE_PEER = 2       # par comum: só participa da eleição do próprio grupo
+
+EVENT_NAMES = {
+    MEMBER: "MEMBER", ELECTION: "ELECTION", OK: "OK", COORDINATOR: "COORDINATOR",
+    ELECTED: "ELECTED", START: "START", FAIL: "FAIL", RECOVER: "RECOVER",
+}
+
+ROLE_NAMES = {ROLE_UNKNOWN: "?", ROLE_CANDIDATE: "candidato", ROLE_PEER: "peer"}
+
+TraceEvent = namedtuple("TraceEvent", "type src dst power timestamp role")
+
+
+class TraceRecorder:
+    """
+    Grava eventos em registros binários de tamanho fixo via mmap.
+    
+    O arquivo é pré-alocado e dobra de tamanho quando enche; cada registro
+    custa um struct.pack_into e a atualização do contador no cabeçalho.
+    
+    Attributes:
+        path: Caminho do arquivo de trace
+        count: Quantidade de registros gravados
+    """
+    
+    def __init__(self, path: str, capacity: int = 1 << 16):
+        self.path = path
+        self.count = 0
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        
+        self._file = open(path, "w+b")
+        self._capacity = capacity
+        self._file.truncate(HEADER.size + capacity * RECORD.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, 0)
+        self._ids_file = open(path + ".ids", "w", encoding="utf-8")
+    
+    def _node_index(self, node_id: Optional[str]) -> int:
+        if node_id is None:
+            return NO_NODE
+        index = self._ids.get(node_id)
+        if index is None:
+            index = self._ids[node_id] = len(self._ids)
+            self._ids_file.write(node_id + "\n")
+            self._ids_file.flush()
+        return index
+    
+    def record(self, event_type: int, src: Optional[str], dst: Optional[str] = None,
+               power: Optional[int] = None, role: int = ROLE_UNKNOWN) -> None:
+        """Grava um evento (thread-safe); role é o papel de src nos eventos MEMBER."""
+        with self._lock:
+            if self._map is None:
+                return
+            if self.count == self._capacity:
+                self._grow()
+            RECORD.pack_into(
+                self._map, HEADER.size + self.count * RECORD.size,
+                event_type, role, self._node_index(src), self._node_index(dst),
+                -1 if power is None else power, time.time()
+            )
+            self.count += 1
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, self.count)
+    
+    def _grow(self) -> None:
+        self._map.close()
+        self._capacity *= 2
+        self._file.truncate(HEADER.size + self._capacity * RECORD.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+    
+    def close(self) -> None:
+        """Descarrega o trace e corta o espaço pré-alocado não usado."""
+        with self._lock:
+            if self._map is None:
+                return
+            self._map.flush()
+            self._map.close()
+            self._map = None
+            self._file.truncate(HEADER.size + self.count * RECORD.size)
+            self._file.close()
+            self._ids_file.close()
+
+
+def read_trace(path: str) -> Iterator[TraceEvent]:
+    """
+    Lê um trace gravado por TraceRecorder.
+    
+    Yields:
+        TraceEvent com os node_ids já resolvidos
+    """
+    with open(path + ".ids", encoding="utf-8") as f:
+        ids = [line.rstrip("\n") for line in f]
+    
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Arquivo de trace inválido: {path}")
+    
+    for i in range(count):
+        event_type, role, src, dst, power, timestamp = RECORD.unpack_from(data, HEADER.size + i * RECORD.size)
+        yield TraceEvent(
+            event_type,
+            None if src == NO_NODE else ids[src],
+            None if dst == NO_NODE else ids[dst],
+            None if power < 0 else power,
+            timestamp,
+            role
+        )
+
+
+@dataclass
+class ReplayResult:
+    """
+    Comparação entre uma eleição gravada e sua reexecução.
+    
+    Attributes:
+        initiator: Quem iniciou a eleição no trace
+        recorded_winner: Vencedor registrado no trace (None se não houve)
+        replayed_winner: Vencedor obtido pela reexecução
+        recorded_messages: Mensagens ELECTION/OK/COORDINATOR gravadas
+        replayed_messages: Mensagens geradas na reexecução
+    """
+    initiator: str
+    recorded_winner: Optional[str]
+    replayed_winner: Optional[str]
+    recorded_messages: int
+    replayed_messages: int
+    
+    @property
+    def matches(self) -> bool:
+        return self.recorded_winner is None or self.recorded_winner == self.replayed_winner
+
+
+class _ReplayNode:
+    """Participante reconstruído a partir do trace."""
+    __slots__ = ("node_id", "power_score", "is_alive", "role")
+    
+    def __init__(self, node_id: str, power_score: int, is_alive: bool = True,
+                 role: int = ROLE_UNKNOWN):
+        self.node_id = node_id
+        self.power_score = power_score
+        self.is_alive = is_alive
+        self.role = role
+
+
+def replay_trace(path: str) -> List[ReplayResult]:
+    """
+    Reexecuta deterministicamente as eleições de um trace.
+    
+    Os eventos MEMBER, FAIL e RECOVER reconstroem quem estava vivo, com
+    qual power e com qual papel; cada START é reexecutado pelo núcleo Bully
+    em memória apenas entre os candidatos à eleição global (pares comuns de
+    traces hierárquicos ficam de fora) e o vencedor é comparado com o
+    ELECTED/COORDINATOR gravado em seguida.
+    
+    Uma falha pode ser detectada só durante a eleição (o FAIL é gravado depois
+    do START, quando o ELECTION fica sem resposta): destinos de ELECTION que
+    não respondem (OK ou anúncio) contam como timeout na reexecução.
+    
+    Args:
+        path: Caminho do arquivo de trace
+    
+    Returns:
+        Uma ReplayResult por eleição iniciada
+    """
+    # Import tardio: election_core importa este módulo
+    from election_core import BullyElection, InMemoryTransport
+    
+    events = list(read_trace(path))
+    members: Dict[str, _ReplayNode] = {}
+    results: List[ReplayResult] = []
+    
+    for index, event in enumerate(events):
+        if event.type == MEMBER and event.power is not None:
+            node = members.get(event.src)
+            if node is None:
+                members[event.src] = _ReplayNode(event.src, event.power, role=event.role)
+            else:
+                node.power_score = event.power
+                node.role = event.role
+        elif event.type in (FAIL, RECOVER) and event.src in members:
+            members[event.src].is_alive = event.type == RECOVER
+        elif event.type == START and event.src in members:
+            recorded_winner, recorded_messages, timed_out = _recorded_outcome(events, index + 1)
+            
+            # Quem inicia a eleição global é candidato, mesmo que o MEMBER que
+            # registrou a promoção ainda não tenha sido gravado
+            participants = [
+                n for n in members.values()
+                if n.is_alive and (n.role != ROLE_PEER or n.node_id == event.src)
+            ]
+            # Os timeouts valem só para esta eleição; o FAIL gravado em seguida
+            # atualiza o estado normalmente
+            restore = [(n, n.is_alive) for n in participants if n.node_id in timed_out]
+            for node, _ in restore:
+                node.is_alive = False
+            transport = InMemoryTransport()
+            core = BullyElection(transport)
+            current = members[event.src]
+            while True:
+                result = core.run(current, participants)
+                if result.winner is not None:
+                    break
+                current = result.answered_by
+            core.announce(current, participants)
+            for node, alive in restore:
+                node.is_alive = alive
+            
+            results.append(ReplayResult(
+                initiator=event.src,
+                recorded_winner=recorded_winner,
+                replayed_winner=current.node_id,
+                recorded_messages=recorded_messages,
+                replayed_messages=sum(transport.messages.values())
+            ))
+    return results
+
+
+def _recorded_outcome(events: List[TraceEvent], start: int):
+    """
+    Resume a eleição gravada a partir de start até o próximo START.
+    
+    Returns:
+        (vencedor gravado, mensagens gravadas, node_ids que receberam um
+        ELECTION antes do resultado e nunca responderam)
+    """
+    winner = None
+    announced = None
+    messages = 0
+    contacted = set()
+    answered = set()
+    for event in events[start:]:
+        if event.type == START:
+            break
+        if event.type in (ELECTION, OK, COORDINATOR):
+            messages += 1
+        # O OK é gravado quando a resposta HTTP volta e pode chegar depois do
+        # anúncio: respostas e anúncios de toda a janela contam como resposta
+        if event.type == ELECTION and winner is None and announced is None:
+            contacted.add(event.dst)
+        elif event.type in (OK, COORDINATOR):
+            answered.add(event.src)
+        if event.type == ELECTED and winner is None:
+            winner = event.src
+        elif event.type == COORDINATOR and announced is None:
+            announced = event.src
+    return winner or announced, messages, contacted - answered
+
+
+# Sequências reais que já divergiram no replay: (descrição, eventos, vencedor)
+REGRESSION_TRACES = [
+    (
+        "v2 hierárquico: coordenador 7204 parado, FAIL gravado só depois do START",
+        [(MEMBER, "7201", None, 30, ROLE_PEER), (MEMBER, "7202", None, 70, ROLE_CANDIDATE),
+         (MEMBER, "7203", None, 40, ROLE_PEER), (MEMBER, "7204", None, 90, ROLE_CANDIDATE),
+         (MEMBER, "7205", None, 20, ROLE_PEER), (MEMBER, "7206", None, 60, ROLE_CANDIDATE),
+         (START, "7202", None, 70, ROLE_UNKNOWN), (ELECTION, "7202", "7204", 70, ROLE_UNKNOWN),
+         (FAIL, "7204", None, 90, ROLE_UNKNOWN), (ELECTED, "7202", None, 70, ROLE_UNKNOWN)],
+        "7202"
+    ),
+    (
+        "v2 hierárquico: OK do mais forte gravado depois do seu anúncio",
+        [(MEMBER, "6661", None, 70, ROLE_CANDIDATE), (MEMBER, "6663", None, 90, ROLE_CANDIDATE),
+         (MEMBER, "6665", None, 60, ROLE_PEER),
+         (START, "6661", None, 70, ROLE_UNKNOWN), (ELECTION, "6661", "6663", 70, ROLE_UNKNOWN),
+         (COORDINATOR, "6663", "6661", 90, ROLE_UNKNOWN), (OK, "6663", "6661", 90, ROLE_UNKNOWN)],
+        "6663"
+    ),
+]
+
+
+def check_replay() -> List[str]:
+    """
+    Reexecuta as sequências de REGRESSION_TRACES.
+    
+    Returns:
+        Descrição de cada sequência cujo replay divergiu (vazia se todas batem)
+    """
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        for i, (description, events, expected) in enumerate(REGRESSION_TRACES):
+            path = os.path.join(directory, f"regressao-{i}.bin")
+            recorder = TraceRecorder(path)
+            for event_type, src, dst, power, role in events:
+                recorder.record(event_type, src, dst, power, role)
+            recorder.close()
+            winners = [r.replayed_winner for r in replay_trace(path)]
+            if winners != [expected]:
+                failures.append(f"{description}: esperado {expected}, reexecutado {winners}")
+    return failures
+
+
+def main(argv: List[str]) -> None:
+    """Linha de comando: dump ou replay de um trace, ou check das regressões."""
+    if len(argv) == 2 and argv[1] == "check":
+        failures = check_replay()
+        for failure in failures:
+            print(f"✗ {failure}")
+        print(f"{len(REGRESSION_TRACES)} sequências de regressão, {len(failures)} divergentes")
+        if failures:
+            sys.exit(1)
+        return
+    
+    if len(argv) != 3 or argv[1] not in ("dump", "replay"):
+        print("Uso: python election_trace.py [dump|replay] ARQUIVO | check")
+        return
+    
+    if argv[1] == "dump":
+        first = None
+        for event in read_trace(argv[2]):
+            first = first or event.timestamp
+            power = "" if event.power is None else f" (power: {event.power})"
+            if event.type == MEMBER:
+                power += f" [{ROLE_NAMES.get(event.role, event.role)}]"
+            dst = f" → {event.dst}" if event.dst else ""
+            print(f"+{event.timestamp - first:9.4f}s  {EVENT_NAMES.get(event.type, event.type):<12}"
+                  f"{event.src}{dst}{power}")
+        return
+    
+    results = replay_trace(argv[2])
+    for i, result in enumerate(results, 1):
+        status = "✓" if result.matches else "✗ DIVERGE"
+        print(f"Eleição {i}: iniciador {result.initiator} | gravado: {result.recorded_winner or '?'} "
+              f"| reexecutado: {result.replayed_winner} | mensagens {result.recorded_messages} → "
+              f"{result.replayed_messages}  {status}")
+    divergent = sum(1 for r in results if not r.matches)
+    print(f"\n{len(results)} eleições reexecutadas, {divergent} divergentes")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
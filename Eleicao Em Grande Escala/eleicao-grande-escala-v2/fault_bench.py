@@ -0,0 +1,99 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server import create_node
+from transport import FaultInjector, FaultInjectingTransport
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mede eleicoes sob latencia, perda e particoes injetadas")
+    parser.add_argument("--nodes", type=int, default=5, help="Quantidade de nos locais")
+    parser.add_argument("--base-port", type=int, default=7001, help="Porta do primeiro no")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia por requisicao (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Jitter por requisicao (s)")
+    parser.add_argument("--drop", type=float, default=0.0, help="Probabilidade de perda (0-1)")
+    parser.add_argument("--observe", type=float, default=10.0, help="Tempo observando o cluster estavel (s)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do injetor")
+    parser.add_argument("--election-mode", choices=["bully", "fast"], default="bully", help="Algoritmo de eleicao")
+    parser.add_argument("--static-timeouts", action="store_true",
+                        help="Usa os timeouts fixos do config.py em vez dos derivados do RTT")
+    parser.add_argument("--verbose", action="store_true", help="Mostra o log dos nos")
+    return parser.parse_args()
+
+
+def wait_for_agreement(nodes, exclude=None, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        coordinators = {n.current_coordinator for n in nodes if n is not exclude}
+        if len(coordinators) == 1 and None not in coordinators and coordinators != {getattr(exclude, "node_id", None)}:
+            return coordinators.pop()
+        time.sleep(0.01)
+    return None
+
+
+def main():
+    args = parse_args()
+    injector = FaultInjector(seed=args.seed)
+    addresses = [f"127.0.0.1:{args.base_port + i}" for i in range(args.nodes)]
+    
+    powers = random.Random(args.seed).sample(range(10, 10 * (args.nodes + 1), 10), args.nodes)
+    
+    nodes = []
+    for i, address in enumerate(addresses):
+        nodes.append(create_node(
+            "127.0.0.1", args.base_port + i, addresses,
+            power_score=powers[i],
+            transport=FaultInjectingTransport(address, injector),
+            election_mode=args.election_mode,
+            adaptive_timeouts=not args.static_timeouts
+        ))
+    
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        for node in nodes:
+            node.start()
+        coordinator_id = wait_for_agreement(nodes)
+        
+        injector.set_fault(latency=args.latency, jitter=args.jitter, drop=args.drop)
+        time.sleep(args.observe)
+        false_detections = sum(n.metrics["coordinator_failures_detected"] for n in nodes)
+        
+        coordinator = next(n for n in nodes if n.node_id == coordinator_id)
+        messages_before = sum(n.metrics["election_messages"] for n in nodes)
+        failed_at = time.time()
+        coordinator.stop()
+        new_coordinator = wait_for_agreement(nodes, exclude=coordinator)
+        failover = time.time() - failed_at
+        failover_messages = sum(n.metrics["election_messages"] for n in nodes) - messages_before
+        
+        for node in nodes:
+            node.stop()
+    
+    survivors = [n for n in nodes if n is not coordinator]
+    latencies = [n.metrics["last_election_latency"] for n in survivors
+                 if n.metrics["last_election_latency"] is not None]
+    
+    print("=" * 60)
+    print(f"  Modo: {args.election_mode} | timeouts: {'fixos' if args.static_timeouts else 'adaptativos'}")
+    print(f"  Nos: {args.nodes} | latencia: {args.latency}s | jitter: {args.jitter}s | perda: {args.drop:.0%}")
+    print("-" * 60)
+    print(f"  Coordenador inicial: {coordinator_id}")
+    print(f"  Deteccoes falsas de falha ({args.observe:.0f}s estavel): {false_detections}")
+    print(f"  Novo coordenador: {new_coordinator or 'sem acordo'}")
+    print(f"  Tempo de failover (falha -> acordo): {failover:.3f}s")
+    if latencies:
+        print(f"  Latencia de eleicao: media {sum(latencies) / len(latencies):.3f}s | max {max(latencies):.3f}s")
+    print(f"  Eleicoes iniciadas: {sum(n.metrics['elections_started'] for n in survivors)}")
+    print(f"  Mensagens ELECTION no failover: {failover_messages}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from config import ID_BLOCK_SIZE, ID_PREFETCH_RATIO, ID_RESERVATION_SIZE, ID_FETCH_TIMEOUT
+
+
+class IdUnavailable(Exception):
+    pass
+
+
+class BlockAllocator:
+    # Lado do coordenador: entrega blocos [inicio, fim) de uma reserva maior.
+    # Antes de usar uma nova reserva, o teto (reserved_until) e replicado
+    # para os peers pelo callback replicate; um novo coordenador recomeca
+    # acima do maior teto conhecido, sem reutilizar IDs ja entregues.
+
+    def __init__(self, start: int, replicate: Callable[[int], None],
+                 reservation_size: int = ID_RESERVATION_SIZE):
+        self.next_id = start
+        self.reserved_until = start
+        self.reservation_size = reservation_size
+        self._replicate = replicate
+        self._lock = threading.Lock()
+
+    def lease(self, count: int) -> Tuple[int, int]:
+        with self._lock:
+            end = self.next_id + count
+            if end > self.reserved_until:
+                reserved_until = max(end, self.reserved_until + self.reservation_size)
+                self._replicate(reserved_until)
+                self.reserved_until = reserved_until
+            start, self.next_id = self.next_id, end
+            return start, end
+
+
+class IdLeaseClient:
+    # Lado de qualquer no: serve IDs do bloco local e busca o proximo bloco
+    # em segundo plano quando restam menos de prefetch_ratio do bloco atual.
+
+    def __init__(self, fetch_block: Callable[[int], Tuple[int, int]],
+                 block_size: int = ID_BLOCK_SIZE, prefetch_ratio: float = ID_PREFETCH_RATIO):
+        self.block_size = block_size
+        self.prefetch_ratio = prefetch_ratio
+        self._fetch_block = fetch_block
+        self._blocks: List[List[int]] = []
+        self._remaining = 0
+        self._fetching = False
+        self._fetch_error: Optional[Exception] = None
+        self._cond = threading.Condition()
+        self.blocks_fetched = 0
+        self.ids_served = 0
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    def take(self, count: int = 1, timeout: float = ID_FETCH_TIMEOUT) -> List[Tuple[int, int]]:
+        # Retorna faixas [inicio, fim) somando count IDs
+        ranges = []
+        with self._cond:
+            while count > 0:
+                if not self._blocks:
+                    self._start_fetch()
+                    if not self._cond.wait_for(lambda: self._blocks or not self._fetching, timeout):
+                        raise IdUnavailable("tempo esgotado aguardando bloco de IDs")
+                    if not self._blocks:
+                        raise IdUnavailable(f"coordenador indisponivel: {self._fetch_error}")
+                    continue
+
+                block = self._blocks[0]
+                taken = min(count, block[1] - block[0])
+                ranges.append((block[0], block[0] + taken))
+                block[0] += taken
+                count -= taken
+                self._remaining -= taken
+                self.ids_served += taken
+                if block[0] == block[1]:
+                    self._blocks.pop(0)
+
+            if self._remaining < self.block_size * self.prefetch_ratio:
+                self._start_fetch()
+        return ranges
+
+    def next_id(self) -> int:
+        return self.take(1)[0][0]
+
+    def _start_fetch(self):
+        if self._fetching:
+            return
+        self._fetching = True
+        threading.Thread(target=self._fetch, daemon=True).start()
+
+    def _fetch(self):
+        block = None
+        error = None
+        try:
+            block = self._fetch_block(self.block_size)
+        except Exception as e:
+            error = e
+        with self._cond:
+            self._fetching = False
+            self._fetch_error = error
+            if block is not None:
+                self._blocks.append(list(block))
+                self._remaining += block[1] - block[0]
+                self.blocks_fetched += 1
+            self._cond.notify_all()
@@ -4,8 +4,7 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from server import create_node
-from config import DEFAULT_HOST, DEFAULT_PORT
+from config import DEFAULT_HOST, DEFAULT_PORT, STATE_DIR, ELECTION_MODE, POWER_MODE
 
 
 def print_header():
@@ -15,22 +14,54 @@ def print_header():
     print("=" * 60)
 
 
+def parse_group(value: str):
+    return "auto" if value == "auto" else int(value)
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="No distribuido para eleicao hierarquica")
     parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="Host para bind")
     parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Porta do servidor")
-    parser.add_argument("--peers", type=str, default="", help="Lista de peers (ex: localhost:5002,localhost:5003)")
+    parser.add_argument("--peers", type=str, default="", help="Lista de peers (ex: localhost:5002,localhost:5003@2)")
     parser.add_argument("--power", type=int, default=None, help="Power score manual")
+    parser.add_argument("--power-mode", choices=["static", "measured"], default=POWER_MODE,
+                        help="static = aleatorio/manual, measured = capacidade medida da maquina")
+    parser.add_argument("--group", type=parse_group, default=None,
+                        help="Grupo deste no (ativa o modo hierarquico); 'auto' escolhe o grupo mais proximo em RTT")
+    parser.add_argument("--state-file", type=str, default=None, help="Arquivo de snapshot do estado")
+    parser.add_argument("--no-state", action="store_true", help="Desativa o snapshot de estado")
+    parser.add_argument("--faults", action="store_true", help="Ativa injecao de falhas controlada via /faults")
+    parser.add_argument("--trace", type=str, default=None, help="Grava trace binario da eleicao neste arquivo")
+    parser.add_argument("--profile", action="store_true", help="Mede o tempo por fase e imprime o resumo ao encerrar")
+    parser.add_argument("--profile-memory", action="store_true", help="Com --profile, mede tambem a alocacao por fase")
+    parser.add_argument("--profile-phase", type=str, default=None,
+                        help="Captura cProfile/tracemalloc desta fase (ex: heartbeat_round, election)")
+    parser.add_argument("--election-mode", choices=["bully", "fast"], default=ELECTION_MODE,
+                        help="Algoritmo de eleicao (fast = contata primeiro o peer mais forte)")
+    parser.add_argument("--static-timeouts", action="store_true",
+                        help="Usa os timeouts fixos do config.py em vez dos derivados do RTT medido")
     return parser.parse_args()
 
 
+def parse_peers(raw: str):
+    peers = []
+    peer_groups = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        address, _, group = item.partition("@")
+        peers.append(address)
+        if group:
+            peer_groups[address] = int(group)
+    return peers, peer_groups
+
+
 def main():
     args = parse_args()
     print_header()
     
-    peers = []
-    if args.peers:
-        peers = [p.strip() for p in args.peers.split(",") if p.strip()]
+    peers, peer_groups = parse_peers(args.peers)
     
     if not peers:
         print("\n⚠️ Erro: Nenhum peer configurado!")
@@ -44,22 +75,60 @@ def main():
     print(f"   Peers: {peers}")
     if args.power:
         print(f"   Power Score: {args.power}")
+    if args.group is not None:
+        print(f"   Grupo: {args.group}")
+    auto_group = args.group == "auto"
+    
+    state_file = None
+    if not args.no_state:
+        state_file = args.state_file or os.path.join(STATE_DIR, f"node-{args.port}.json")
     
     print("\n" + "-" * 60)
     print("   Iniciando no distribuido...")
     print("-" * 60 + "\n")
     
+    # Import adiado: flask e requests so sao carregados quando o no sobe
+    from server import create_node
+    from id_allocator import IdUnavailable
+    from profiling import profiler
+    if args.profile or args.profile_phase:
+        profiler.configure(True, args.profile_memory, args.profile_phase)
+    
+    power_provider = None
+    if args.power_mode == "measured":
+        from power import PowerScoreProvider
+        power_provider = PowerScoreProvider()
+    
+    recorder = None
+    if args.trace:
+        from election_trace import TraceRecorder
+        recorder = TraceRecorder(args.trace)
+    
+    transport = None
+    if args.faults:
+        from transport import FaultInjectingTransport
+        transport = FaultInjectingTransport(f"{args.host}:{args.port}")
+    
     node = create_node(
         host=args.host,
         port=args.port,
         peers=peers,
-        power_score=args.power
+        power_score=args.power,
+        group=None if auto_group else args.group,
+        peer_groups=peer_groups,
+        state_file=state_file,
+        transport=transport,
+        election_mode=args.election_mode,
+        power_provider=power_provider,
+        recorder=recorder,
+        auto_group=auto_group,
+        adaptive_timeouts=not args.static_timeouts
     )
     
     try:
         node.start()
         print("\n" + "=" * 60)
-        print("  ✅ NO ATIVO - Comandos: status, election, quit")
+        print("  ✅ NO ATIVO - Comandos: status, election, id, quit")
         print("=" * 60 + "\n")
         
         while True:
@@ -72,11 +141,16 @@ def main():
                     print("🗳️ Forcando nova eleicao...")
                     node.election_in_progress = False
                     node.start_election()
+                elif cmd == "id":
+                    try:
+                        print(f"🔢 ID: {node.ids.next_id()}")
+                    except IdUnavailable as e:
+                        print(f"⚠️ {e}")
                 elif cmd in ["quit", "exit", "q"]:
                     print("👋 Encerrando...")
                     break
                 elif cmd == "help":
-                    print("Comandos: status, election, quit")
+                    print("Comandos: status, election, id, quit")
                 elif cmd:
                     print(f"Comando desconhecido: {cmd}")
                     
@@ -88,6 +162,8 @@ def main():
     
     finally:
         node.stop()
+        if profiler.enabled:
+            print("\n" + profiler.summary())
         print("✅ No encerrado.")
 
 
@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+from typing import Optional
+
+from config import (
+    MIN_POWER_SCORE, MAX_POWER_SCORE,
+    POWER_SAMPLE_INTERVAL, POWER_SMOOTHING, POWER_REFERENCE
+)
+
+
+def _read_meminfo_available() -> float:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0.0
+
+
+def _read_uptime() -> float:
+    try:
+        with open("/proc/uptime") as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _read_loadavg() -> float:
+    try:
+        return os.getloadavg()[0]
+    except (OSError, AttributeError):
+        return 0.0
+
+
+def scale_power(raw: float) -> int:
+    # Mapeia a capacidade bruta (sem teto) para a faixa do power score por
+    # uma curva crescente e saturante: maquinas maiores continuam com power
+    # maior em vez de todas baterem em MAX_POWER_SCORE
+    raw = max(raw, 0.0)
+    fraction = raw / (raw + POWER_REFERENCE)
+    return int(round(MIN_POWER_SCORE + (MAX_POWER_SCORE - MIN_POWER_SCORE) * fraction))
+
+
+class PowerScoreProvider:
+    # Power score medido a partir da capacidade real da maquina. A leitura
+    # de /proc e limitada a uma a cada POWER_SAMPLE_INTERVAL segundos e o
+    # valor e suavizado (media movel exponencial) para nao oscilar com ruido.
+    
+    def __init__(self, sample_interval: float = POWER_SAMPLE_INTERVAL,
+                 smoothing: float = POWER_SMOOTHING):
+        self.sample_interval = sample_interval
+        self.smoothing = smoothing
+        self._value: Optional[float] = None
+        self._sampled_at = 0.0
+        self._lock = threading.Lock()
+        self.last_metrics: dict = {}
+    
+    def measure(self) -> float:
+        cpus = os.cpu_count() or 1
+        load = _read_loadavg()
+        free_cpus = max(cpus - load, 0.1)
+        mem_gb = _read_meminfo_available() / (1024 ** 3)
+        uptime_h = _read_uptime() / 3600
+        
+        self.last_metrics = {
+            "cpus": cpus,
+            "load": round(load, 2),
+            "mem_available_gb": round(mem_gb, 2),
+            "uptime_h": round(uptime_h, 2)
+        }
+        return 10 * free_cpus + 5 * mem_gb + min(uptime_h, 24)
+    
+    def sample(self) -> int:
+        with self._lock:
+            now = time.monotonic()
+            if self._value is None or now - self._sampled_at >= self.sample_interval:
+                measured = self.measure()
+                if self._value is None:
+                    self._value = measured
+                else:
+                    self._value += self.smoothing * (measured - self._value)
+                self._sampled_at = now
+            return scale_power(self._value)
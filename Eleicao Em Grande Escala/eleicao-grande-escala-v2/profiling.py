@@ -0,0 +1,231 @@
+# Copia gerada por sync_shared.py a partir de eleicao-grande-escala/profiling.py (sha256 fcf01729931c850b51c5fa092c46421797ffad545eb4d764614f03d7515959c5) - nao edite
+"""
+profiling.py - Instrumentação por fases (spans) dos caminhos de eleição
+
+Este módulo mede o tempo (e opcionalmente a alocação de memória) de fases
+nomeadas como criação da rede, eleição global, tratamento de falha e, na v2,
+rodadas de heartbeat e handlers HTTP. Desligado, cada span custa apenas uma
+verificação de flag.
+
+Ativação por variável de ambiente (ou Profiler.configure):
+- ELECTION_PROFILE=1      liga os timers por fase
+- ELECTION_PROFILE=mem    também mede a alocação líquida de cada fase (tracemalloc)
+- ELECTION_PROFILE_PHASE  nome de uma fase para captura com cProfile e tracemalloc
+
+Exemplo:
+    ELECTION_PROFILE=1 ELECTION_PROFILE_PHASE=run_global_election python main.py
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import wraps
+from typing import Dict, List, Optional
+
+
+_NULL_SPAN = nullcontext()
+
+# Alocações do próprio profiler não entram na captura
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+]
+
+
+@dataclass
+class PhaseStats:
+    """
+    Agregados de uma fase.
+    
+    Attributes:
+        count: Quantidade de execuções
+        total: Tempo total (segundos)
+        max: Maior duração de uma execução (segundos)
+        allocated: Alocação líquida acumulada (bytes), se medida
+    """
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    allocated: int = 0
+
+
+class _Span:
+    """Span ativo de uma fase; mede ao entrar e agrega ao sair."""
+    __slots__ = ("profiler", "name", "started", "memory", "profile", "snapshot")
+    
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.profile = None
+        self.snapshot = None
+    
+    def __enter__(self):
+        profiler = self.profiler
+        capture = self.name == profiler.capture_phase
+        if capture:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self.snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            self.profile = cProfile.Profile()
+            try:
+                self.profile.enable()
+            except ValueError:
+                # Outro profiler já está ativo (ex.: span capturado aninhado)
+                self.profile = None
+        self.memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        allocated = 0
+        if self.memory is not None and tracemalloc.is_tracing():
+            allocated = tracemalloc.get_traced_memory()[0] - self.memory
+        if self.profile is not None:
+            self.profile.disable()
+        self.profiler._record(self, elapsed, allocated)
+        return False
+
+
+class Profiler:
+    """
+    Registro de spans por fase.
+    
+    Attributes:
+        enabled: Se os spans são medidos
+        track_memory: Se a alocação líquida de cada fase é medida
+        capture_phase: Fase capturada com cProfile e tracemalloc (ou None)
+    """
+    
+    def __init__(self, enabled: bool = False, track_memory: bool = False,
+                 capture_phase: Optional[str] = None):
+        self.enabled = False
+        self.track_memory = False
+        self.capture_phase: Optional[str] = None
+        self.phases: Dict[str, PhaseStats] = {}
+        self._profiles: List[cProfile.Profile] = []
+        self._allocations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.configure(enabled, track_memory, capture_phase)
+    
+    @classmethod
+    def from_env(cls) -> "Profiler":
+        """Cria o profiler a partir de ELECTION_PROFILE e ELECTION_PROFILE_PHASE."""
+        mode = os.environ.get("ELECTION_PROFILE", "").strip().lower()
+        phase = os.environ.get("ELECTION_PROFILE_PHASE") or None
+        return cls(
+            enabled=mode not in ("", "0", "false", "off") or phase is not None,
+            track_memory=mode == "mem",
+            capture_phase=phase
+        )
+    
+    def configure(self, enabled: bool = True, track_memory: bool = False,
+                  capture_phase: Optional[str] = None) -> None:
+        """Liga/desliga a instrumentação e escolhe a fase capturada."""
+        self.enabled = enabled or capture_phase is not None
+        self.track_memory = track_memory
+        self.capture_phase = capture_phase
+        if self.enabled and track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    def reset(self) -> None:
+        """Descarta os agregados e capturas acumulados."""
+        with self._lock:
+            self.phases.clear()
+            self._profiles.clear()
+            self._allocations.clear()
+    
+    def span(self, name: str):
+        """Context manager que mede a fase name (nulo se desligado)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+    
+    def profiled(self, name: Optional[str] = None):
+        """Decorador que envolve a função em um span (padrão: nome da função)."""
+        def decorator(func):
+            phase = name or func.__name__
+            
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, phase):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def _record(self, span: _Span, elapsed: float, allocated: int) -> None:
+        with self._lock:
+            stats = self.phases.get(span.name)
+            if stats is None:
+                stats = self.phases[span.name] = PhaseStats()
+            stats.count += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.allocated += allocated
+            
+            if span.profile is not None:
+                self._profiles.append(span.profile)
+            if span.snapshot is not None and tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+                diff = snapshot.compare_to(span.snapshot, "lineno")
+                for stat in diff[:20]:
+                    key = str(stat.traceback)
+                    self._allocations[key] = self._allocations.get(key, 0) + stat.size_diff
+    
+    def summary(self, top: int = 15) -> str:
+        """
+        Gera o relatório por fase e, se houver, as capturas da fase escolhida.
+        
+        Args:
+            top: Quantidade de funções/linhas listadas nas capturas
+        
+        Returns:
+            Texto com tempo total, médio e máximo por fase
+        """
+        with self._lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1].total, reverse=True)
+            profiles = list(self._profiles)
+            allocations = sorted(self._allocations.items(), key=lambda item: item[1], reverse=True)
+        
+        show_memory = any(stats.allocated for _, stats in phases)
+        header = f"{'Fase':<32} {'N':>7} {'Total (ms)':>12} {'Médio (ms)':>11} {'Máx (ms)':>10}"
+        if show_memory:
+            header += f" {'Alocado (KiB)':>14}"
+        lines = ["=" * len(header), "  PERFIL POR FASE", "=" * len(header), header, "-" * len(header)]
+        for name, stats in phases:
+            line = (f"{name:<32} {stats.count:>7} {stats.total * 1000:>12.2f} "
+                    f"{stats.total * 1000 / stats.count:>11.3f} {stats.max * 1000:>10.2f}")
+            if show_memory:
+                line += f" {stats.allocated / 1024:>14.1f}"
+            lines.append(line)
+        if not phases:
+            lines.append("  (nenhuma fase registrada)")
+        
+        if profiles:
+            out = io.StringIO()
+            stats = pstats.Stats(profiles[0], stream=out)
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.sort_stats("cumulative").print_stats(top)
+            lines.append(f"\ncProfile da fase '{self.capture_phase}' ({len(profiles)} execuções):")
+            lines.append(out.getvalue().rstrip())
+        
+        if allocations:
+            lines.append(f"\nMaiores alocações na fase '{self.capture_phase}':")
+            for location, size in allocations[:top]:
+                lines.append(f"  {size / 1024:>10.1f} KiB  {location}")
+        return "\n".join(lines)
+
+
+# Instância compartilhada pelo simulador e pelo nó da v2
+profiler = Profiler.from_env()
+span = profiler.span
+profiled = profiler.profiled
@@ -0,0 +1,51 @@
+from typing import Optional
+
+from config import (
+    REQUEST_TIMEOUT, REQUEST_TIMEOUT_MIN, REQUEST_TIMEOUT_MAX,
+    RTT_SMOOTHING, RTT_VARIANCE_SMOOTHING, RTO_VARIANCE_FACTOR, RTO_MIN_SAMPLES
+)
+
+MAX_BACKOFF = 64
+
+
+class RttEstimator:
+    # Estimador de RTO de um peer no estilo do TCP (RFC 6298): RTT suavizado
+    # (srtt) e variacao (rttvar) a partir das amostras dos heartbeats. O
+    # timeout e srtt + K * rttvar dentro de [floor, ceiling] (initial ate
+    # RTO_MIN_SAMPLES amostras); cada timeout dobra o RTO (backoff) ate a
+    # proxima amostra valida. Valores em segundos.
+
+    def __init__(self, initial: float = REQUEST_TIMEOUT, floor: float = REQUEST_TIMEOUT_MIN,
+                 ceiling: float = REQUEST_TIMEOUT_MAX):
+        self.initial = initial
+        self.floor = floor
+        self.ceiling = ceiling
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.samples = 0
+        self._backoff = 1
+
+    def observe(self, rtt: float):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += RTT_VARIANCE_SMOOTHING * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += RTT_SMOOTHING * (rtt - self.srtt)
+        self.samples += 1
+        self._backoff = 1
+
+    @property
+    def ready(self) -> bool:
+        return self.samples >= RTO_MIN_SAMPLES
+
+    def on_timeout(self):
+        self._backoff = min(self._backoff * 2, MAX_BACKOFF)
+
+    @property
+    def rto(self) -> float:
+        if not self.ready:
+            base = self.initial
+        else:
+            base = self.srtt + RTO_VARIANCE_FACTOR * self.rttvar
+        return min(max(base, self.floor) * self._backoff, self.ceiling)
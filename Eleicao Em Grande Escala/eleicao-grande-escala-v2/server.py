@@ -1,28 +1,138 @@
 import threading
 import time
 import random
+import uuid
 import requests
-from flask import Flask, request, jsonify
-from typing import List, Dict, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, jsonify, make_response, g
+from werkzeug.serving import make_server
+from typing import List, Dict, Optional, Callable, Tuple
 import logging
 
 from config import (
     DEFAULT_HOST, DEFAULT_PORT, 
     HEARTBEAT_INTERVAL, HEARTBEAT_TIMEOUT, 
     ELECTION_TIMEOUT, REQUEST_TIMEOUT,
-    MIN_POWER_SCORE, MAX_POWER_SCORE
+    MIN_POWER_SCORE, MAX_POWER_SCORE,
+    STATUS_DEFAULT_PAGE_SIZE, STATUS_MAX_PAGE_SIZE,
+    SNAPSHOT_MAX_AGE,
+    HEARTBEAT_WORKERS, STARTUP_WAIT_TIMEOUT,
+    ELECTION_MODE,
+    POWER_HYSTERESIS_MARGIN, POWER_HYSTERESIS_PERIOD,
+    ID_BLOCK_SIZE, ID_MAX_REQUEST,
+    ADAPTIVE_TIMEOUTS, ELECTION_TIMEOUT_FACTOR, ELECTION_TIMEOUT_MIN, ELECTION_TIMEOUT_MAX
 )
+from state_store import save_snapshot, load_snapshot
+from transport import HttpTransport, FaultInjectingTransport
+from id_allocator import BlockAllocator, IdLeaseClient, IdUnavailable
+from rtt_estimator import RttEstimator
+
+# Nucleo do algoritmo Bully, trace, profiling e coordenadas: copias dos modulos
+# do simulador (v1), mantidas em sincronia para a v2 rodar de forma independente
+from election_core import BullyElection, Candidate, ElectionTransport
+import election_trace as trace
+from profiling import profiler, profiled
+from coordinates import VivaldiCoordinate
 
 logging.getLogger('werkzeug').setLevel(logging.ERROR)
 
+SCOPE_GROUP = "group"
+SCOPE_GLOBAL = "global"
+
+MODE_BULLY = "bully"
+MODE_FAST = "fast"
+
+
+class HttpElectionTransport(ElectionTransport):
+    
+    def __init__(self, node: "DistributedNode", scope: str = SCOPE_GLOBAL):
+        self.node = node
+        self.scope = scope
+    
+    def send_election(self, sender, target) -> bool:
+        node = self.node
+        node.metrics["election_messages"] += 1
+        if self.scope == SCOPE_GLOBAL:
+            node._trace(trace.ELECTION, sender.node_id, target.node_id, sender.power_score)
+        try:
+            node._log(f"📤 Enviando ELECTION para {target.node_id}...")
+            
+            response = node.transport.post(
+                target.node_id, "/election",
+                {"sender_id": sender.node_id, "power_score": sender.power_score, "scope": self.scope,
+                 "term": node.term},
+                node._request_timeout(target.node_id, ELECTION_TIMEOUT)
+            )
+            
+            if response.status_code == 200 and response.json().get("response") == "OK":
+                node._log(f"📥 Recebido OK de {target.node_id}")
+                if self.scope == SCOPE_GLOBAL:
+                    node._trace(trace.OK, target.node_id, sender.node_id, target.power_score)
+                return True
+        
+        except requests.exceptions.RequestException as e:
+            node._log(f"⚠️ Falha ao contatar {target.node_id}")
+            node._note_request_failure(target.node_id, e)
+            node._update_peer(target.node_id, alive=False)
+        return False
+    
+    def send_coordinator(self, coordinator, target, forward: bool = False) -> bool:
+        if self.scope == SCOPE_GROUP:
+            path = "/superpeer"
+            payload = {
+                "superpeer_id": coordinator.node_id,
+                "power_score": coordinator.power_score,
+                "group": self.node.group
+            }
+        else:
+            path = "/coordinator"
+            payload = {
+                "sender_id": self.node.node_id,
+                "coordinator_id": coordinator.node_id,
+                "power_score": coordinator.power_score,
+                "term": self.node.term,
+                "forward": forward
+            }
+        
+        if self.scope == SCOPE_GLOBAL:
+            self.node._trace(trace.COORDINATOR, coordinator.node_id, target.node_id, coordinator.power_score)
+        try:
+            self.node.transport.post(target.node_id, path, payload, self.node._request_timeout(target.node_id))
+            self.node._log(f"📢 Anunciado ({self.scope}) para {target.node_id}")
+            return True
+        except requests.exceptions.RequestException:
+            self.node._log(f"⚠️ Falha ao anunciar para {target.node_id}")
+            return False
+
 
 class DistributedNode:
     
-    def __init__(self, host: str, port: int, peers: List[str], power_score: int = None):
+    def __init__(self, host: str, port: int, peers: List[str], power_score: int = None,
+                 group: Optional[int] = None, peer_groups: Optional[Dict[str, int]] = None,
+                 state_file: Optional[str] = None, transport=None,
+                 election_mode: str = ELECTION_MODE, power_provider=None, recorder=None,
+                 auto_group: bool = False, adaptive_timeouts: bool = ADAPTIVE_TIMEOUTS):
         self.host = host
         self.port = port
         self.node_id = f"{host}:{port}"
-        self.power_score = power_score or random.randint(MIN_POWER_SCORE, MAX_POWER_SCORE)
+        
+        self.state_file = state_file
+        self._snapshot = load_snapshot(state_file) if state_file else None
+        if self._snapshot and self._snapshot.get("node_id") != self.node_id:
+            self._snapshot = None
+        cached_power = self._snapshot.get("power_score") if self._snapshot else None
+        
+        # Grupo automatico: reaproveita a escolha salva no snapshot
+        self.auto_group = auto_group
+        if auto_group and group is None and self._snapshot:
+            group = self._snapshot.get("group")
+        
+        # Power score medido so e usado quando nao ha valor manual
+        self.power_provider = None if power_score else power_provider
+        measured_power = self.power_provider.sample() if self.power_provider else None
+        self.power_score = (power_score or measured_power or cached_power
+                            or random.randint(MIN_POWER_SCORE, MAX_POWER_SCORE))
+        self._stronger_since: Optional[float] = None
         
         self.peers: List[str] = [p for p in peers if p != self.node_id]
         self.peer_status: Dict[str, dict] = {}
@@ -30,70 +140,501 @@ class DistributedNode:
             self.peer_status[peer] = {
                 "last_seen": 0,
                 "alive": False,
-                "power_score": None
+                "power_score": None,
+                "is_superpeer": False
             }
         
         self.is_coordinator = False
         self.current_coordinator: Optional[str] = None
+        self.coordinator_power: Optional[int] = None
+        # Termo (epoca) da eleicao global: cresce a cada coordenador eleito e
+        # permite descartar anuncios de eleicoes ja superadas
+        self.term = self._snapshot.get("term", 0) if self._snapshot else 0
+        self.coordinator_term = 0
+        self._term_lock = threading.Lock()
         self.election_in_progress = False
+        self.election_mode = election_mode
+        self._election_done = {SCOPE_GROUP: threading.Event(), SCOPE_GLOBAL: threading.Event()}
+        
+        # Modo hierarquico: grupos elegem um superpeer e so superpeers
+        # participam da eleicao global
+        self.group = group
+        self.peer_groups: Dict[str, int] = dict(peer_groups or {})
+        self.hierarchical = group is not None
+        self.group_members: List[str] = [
+            p for p in self.peers if self.peer_groups.get(p) == group
+        ] if self.hierarchical else []
+        self.is_superpeer = False
+        self.group_superpeer: Optional[str] = None
+        self.group_election_in_progress = False
+        
+        # Coordenadas Vivaldi aprendidas com o RTT dos heartbeats
+        self.coordinates = VivaldiCoordinate()
+        self._coordinates_lock = threading.Lock()
+        self.peer_coordinates: Dict[str, VivaldiCoordinate] = {}
+        self.peer_rtt: Dict[str, float] = {}
+        
+        # Timeouts derivados do RTT medido (srtt/rttvar por peer)
+        self.adaptive_timeouts = adaptive_timeouts
+        self.rtt_estimators: Dict[str, RttEstimator] = {}
+        
+        # Versao monotonica do estado, usada por /status (ETag e ?since=). A versao
+        # recomeca a cada boot, entao vem sempre acompanhada da epoca da instancia
+        self.state_version = 0
+        self.boot_epoch = uuid.uuid4().hex[:12]
+        self._reported_metrics: dict = {}
+        self.peer_versions: Dict[str, int] = {peer: 0 for peer in self.peers}
+        self._state_lock = threading.Lock()
+        self._saved_version = -1
+        self._save_lock = threading.Lock()
+        
+        self.transport = transport or HttpTransport()
+        self.recorder = recorder
+        self.metrics = {
+            "elections_started": 0,
+            "election_messages": 0,
+            "coordinator_failures_detected": 0,
+            "last_election_latency": None
+        }
+        self._election_started_at: Optional[float] = None
+        
+        # Sequencia global: o coordenador empresta blocos de IDs e cada no
+        # serve IDs localmente do bloco recebido
+        self.id_reserved_until = self._snapshot.get("id_reserved_until", 0) if self._snapshot else 0
+        self.id_allocator: Optional[BlockAllocator] = None
+        self._allocator_lock = threading.Lock()
+        self.ids = IdLeaseClient(self._fetch_id_block)
         
         self.app = Flask(__name__)
         self._setup_routes()
         
         self.running = False
+        self.server = None
         self.heartbeat_thread: Optional[threading.Thread] = None
+        self.first_heartbeat_done = threading.Event()
         self.on_status_change: Optional[Callable] = None
     
     def _setup_routes(self):
+        if profiler.enabled:
+            @self.app.before_request
+            def start_span():
+                g.span = profiler.span(f"http.{request.endpoint}")
+                g.span.__enter__()
+            
+            @self.app.teardown_request
+            def end_span(exc):
+                span = g.pop("span", None)
+                if span is not None:
+                    span.__exit__(None, None, None)
+        
         @self.app.route('/heartbeat', methods=['GET'])
         def heartbeat():
             return jsonify({
                 "node_id": self.node_id,
                 "power_score": self.power_score,
                 "is_coordinator": self.is_coordinator,
+                "current_coordinator": self.current_coordinator,
+                "coordinator_power": self.coordinator_power,
+                "term": self.term,
+                "is_superpeer": self.is_superpeer,
+                "group": self.group,
+                "coordinates": self.coordinates.to_dict(),
                 "alive": True
             })
         
+        @self.app.route('/coordinates', methods=['GET'])
+        def coordinates():
+            return jsonify({
+                "node_id": self.node_id,
+                "coordinates": self.coordinates.to_dict(),
+                "peers": {
+                    peer: {
+                        "rtt_ms": self.peer_rtt.get(peer),
+                        "estimated_rtt_ms": self._estimated_rtt(peer),
+                        "timeout_ms": round(self._request_timeout(peer) * 1000, 1)
+                    }
+                    for peer in self.peers
+                }
+            })
+        
         @self.app.route('/status', methods=['GET'])
         def status():
-            return jsonify({
+            version = self.state_version
+            etag = f"{self.boot_epoch}-{version}-{request.query_string.decode()}"
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+                response.set_etag(etag)
+                return response
+            
+            body = {
                 "node_id": self.node_id,
                 "power_score": self.power_score,
                 "is_coordinator": self.is_coordinator,
                 "current_coordinator": self.current_coordinator,
-                "peers": self.peer_status,
-                "election_in_progress": self.election_in_progress
+                "term": self.term,
+                "election_in_progress": self.election_in_progress,
+                "group": self.group,
+                "is_superpeer": self.is_superpeer,
+                "group_superpeer": self.group_superpeer,
+                "metrics": dict(self.metrics),
+                "version": version,
+                "epoch": self.boot_epoch
+            }
+            if self.power_provider:
+                body["power_metrics"] = dict(self._reported_metrics)
+            
+            # Um delta so vale para a mesma instancia; de outra epoca (ou sem epoca)
+            # o cliente recebe a listagem completa
+            since = request.args.get("since", type=int)
+            if since is not None and request.args.get("epoch") == self.boot_epoch:
+                body["delta"] = True
+                body["peers"] = {
+                    peer: dict(self.peer_status[peer])
+                    for peer, peer_version in list(self.peer_versions.items())
+                    if peer_version > since
+                }
+            else:
+                offset = max(request.args.get("offset", 0, type=int), 0)
+                limit = request.args.get("limit", STATUS_DEFAULT_PAGE_SIZE, type=int)
+                limit = min(max(limit, 1), STATUS_MAX_PAGE_SIZE)
+                
+                page = sorted(self.peers)[offset:offset + limit]
+                next_offset = offset + len(page)
+                body["delta"] = False
+                body["peers"] = {peer: dict(self.peer_status[peer]) for peer in page}
+                body["total_peers"] = len(self.peers)
+                body["next_offset"] = next_offset if next_offset < len(self.peers) else None
+            
+            response = jsonify(body)
+            response.set_etag(etag)
+            return response
+        
+        @self.app.route('/ids', methods=['GET'])
+        def ids():
+            count = min(max(request.args.get("count", 1, type=int), 1), ID_MAX_REQUEST)
+            try:
+                ranges = self.ids.take(count)
+            except IdUnavailable as e:
+                return jsonify({"error": str(e)}), 503
+            return jsonify({"count": count, "ranges": ranges})
+        
+        @self.app.route('/ids/lease', methods=['POST'])
+        def lease_ids():
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                return jsonify({"error": "corpo JSON deve ser um objeto"}), 400
+            try:
+                count = min(max(int(data.get("count", ID_BLOCK_SIZE)), 1), ID_MAX_REQUEST)
+            except (TypeError, ValueError):
+                return jsonify({"error": f"count invalido: {data.get('count')!r}"}), 400
+            # Cercamento por termo: so atende quem conhece o mesmo coordenador
+            term = data.get("term")
+            if term is not None and term != self.term:
+                self._observe_term(term)
+                return jsonify({"error": "termo divergente", "term": self.term,
+                                "coordinator": self.current_coordinator}), 409
+            try:
+                allocator = self._sequencer()
+                if allocator is None:
+                    return jsonify({"error": "nao sou o coordenador", "term": self.term,
+                                    "coordinator": self.current_coordinator}), 409
+                start, end = allocator.lease(count)
+            except IdUnavailable as e:
+                return jsonify({"error": str(e)}), 503
+            return jsonify({"start": start, "end": end, "coordinator": self.node_id, "term": self.term})
+        
+        @self.app.route('/ids/reserve', methods=['POST'])
+        def reserve_ids():
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                return jsonify({"error": "corpo JSON deve ser um objeto"}), 400
+            try:
+                reserved_until = int(data.get("reserved_until", 0))
+            except (TypeError, ValueError):
+                return jsonify({"error": f"reserved_until invalido: {data.get('reserved_until')!r}"}), 400
+            term = data.get("term")
+            if term is not None and term < self.term:
+                return jsonify({"error": "termo obsoleto", "term": self.term}), 409
+            self._observe_term(term)
+            # Um teto que nao supera o conhecido viria de um coordenador que
+            # comecou abaixo de IDs ja entregues: recusa e informa o teto atual
+            if reserved_until <= self.id_reserved_until:
+                return jsonify({"error": "reserva abaixo do teto conhecido",
+                                "reserved_until": self.id_reserved_until, "term": self.term}), 409
+            self._note_reservation(reserved_until)
+            return jsonify({"status": "ok"})
+        
+        @self.app.route('/ids/state', methods=['GET'])
+        def ids_state():
+            return jsonify({
+                "reserved_until": self.id_reserved_until,
+                "sequencer": self.id_allocator is not None,
+                "remaining": self.ids.remaining,
+                "served": self.ids.ids_served,
+                "blocks_fetched": self.ids.blocks_fetched
             })
         
+        @self.app.route('/faults', methods=['GET', 'POST', 'DELETE'])
+        def faults():
+            if not isinstance(self.transport, FaultInjectingTransport):
+                return jsonify({"error": "injecao de falhas desativada"}), 404
+            
+            injector = self.transport.injector
+            if request.method == 'POST':
+                data = request.get_json(silent=True)
+                if not isinstance(data, dict):
+                    return jsonify({"error": "corpo JSON deve ser um objeto"}), 400
+                dst = data.pop("peer", "*")
+                try:
+                    injector.set_fault(self.node_id, dst, **data)
+                except (ValueError, TypeError) as e:
+                    return jsonify({"error": str(e)}), 400
+                self._log(f"🧪 Falha injetada para {dst}: {data}")
+            elif request.method == 'DELETE':
+                injector.clear(self.node_id)
+                self._log("🧪 Falhas injetadas removidas")
+            
+            return jsonify({"rules": injector.describe(self.node_id)})
+        
         @self.app.route('/election', methods=['POST'])
         def receive_election():
             data = request.json
             sender_id = data.get("sender_id")
             sender_power = data.get("power_score", 0)
+            scope = data.get("scope", SCOPE_GLOBAL)
+            if scope == SCOPE_GLOBAL:
+                self._observe_term(data.get("term"))
             
-            self._log(f"📩 ELECTION recebido de {sender_id} (power: {sender_power})")
+            self._log(f"📩 ELECTION ({scope}) recebido de {sender_id} (power: {sender_power})")
             
-            if self.power_score > sender_power:
+            eligible = scope == SCOPE_GROUP or not self.hierarchical or self.is_superpeer
+            if eligible and BullyElection.should_answer(self, Candidate(sender_id, sender_power)):
                 self._log(f"✅ Respondendo OK para {sender_id}")
-                threading.Thread(target=self.start_election, daemon=True).start()
+                threading.Thread(target=self.start_election, args=(scope,), daemon=True).start()
                 return jsonify({"response": "OK", "node_id": self.node_id, "power_score": self.power_score})
             else:
                 return jsonify({"response": "ACKNOWLEDGED", "node_id": self.node_id})
         
+        @self.app.route('/superpeer', methods=['POST'])
+        def receive_superpeer():
+            data = request.json
+            superpeer_id = data.get("superpeer_id")
+            
+            self._log(f"⭐ SUPERPEER do grupo {self.group} anunciado: {superpeer_id} "
+                      f"(power: {data.get('power_score')})")
+            
+            self.group_superpeer = superpeer_id
+            was_superpeer = self.is_superpeer
+            self.is_superpeer = (superpeer_id == self.node_id)
+            if self.is_superpeer != was_superpeer:
+                self._trace_member(self.node_id, self.power_score, self.is_superpeer)
+            self._set_electing(SCOPE_GROUP, False)
+            self._bump_version()
+            self._save_state()
+            
+            return jsonify({"status": "acknowledged"})
+        
         @self.app.route('/coordinator', methods=['POST'])
         def receive_coordinator():
             data = request.json
             coordinator_id = data.get("coordinator_id")
             coordinator_power = data.get("power_score")
             
-            self._log(f"👑 COORDINATOR anunciado: {coordinator_id} (power: {coordinator_power})")
+            term = data.get("term")
+            
+            self._log(f"👑 COORDINATOR anunciado: {coordinator_id} (power: {coordinator_power}, termo: {term})")
             
-            self.current_coordinator = coordinator_id
-            self.is_coordinator = (coordinator_id == self.node_id)
-            self.election_in_progress = False
+            status = self._accept_coordinator(coordinator_id, coordinator_power, term)
+            if status != "acknowledged":
+                return jsonify({"status": status, "term": self.term})
+            
+            # Anuncio direto prova que o coordenador esta vivo, mesmo que o
+            # heartbeat ainda nao o tenha alcancado
+            if data.get("sender_id") == coordinator_id and coordinator_id in self.peer_status:
+                self._update_peer(coordinator_id, last_seen=time.time(), alive=True,
+                                  power_score=coordinator_power)
+            
+            if data.get("forward") and self.is_superpeer:
+                threading.Thread(
+                    target=self._send_coordinator,
+                    args=(self._alive(self.group_members), coordinator_id, coordinator_power, False),
+                    daemon=True
+                ).start()
             
             return jsonify({"status": "acknowledged"})
     
+    def _observe_term(self, term: Optional[int]):
+        with self._term_lock:
+            if term is None or term <= self.term:
+                return
+            self.term = term
+        self._bump_version()
+    
+    def _accept_coordinator(self, coordinator_id: str, coordinator_power: Optional[int],
+                            term: Optional[int]) -> str:
+        # Anuncio com termo menor que o conhecido vem de uma eleicao ja
+        # superada (ex.: coordenador que ficou isolado por uma particao)
+        if term is not None and term < self.term:
+            self._log(f"🚫 Anuncio obsoleto de {coordinator_id} rejeitado (termo {term} < {self.term})")
+            return "stale"
+        self._observe_term(term)
+        
+        eligible = not self.hierarchical or self.is_superpeer
+        if eligible and coordinator_power is not None and self._clearly_stronger_than(coordinator_power, coordinator_id):
+            self._log(f"⚔️ Rejeitando {coordinator_id} - tenho power maior, iniciando eleicao...")
+            threading.Thread(target=self.start_election, daemon=True).start()
+            return "rejected"
+        
+        self._trace(trace.COORDINATOR, coordinator_id, self.node_id, coordinator_power)
+        self.current_coordinator = coordinator_id
+        self.coordinator_power = coordinator_power
+        self.coordinator_term = self.term
+        self.is_coordinator = (coordinator_id == self.node_id)
+        self._reset_sequencer()
+        self._set_electing(SCOPE_GLOBAL, False)
+        self._record_election_end()
+        self._bump_version()
+        self._save_state()
+        return "acknowledged"
+    
+    def _discover_coordinator(self, peer: str, data: dict):
+        # Coordenador e termo vem de carona no heartbeat: um no que entra (ou
+        # volta de uma particao) adota o coordenador vigente em vez de
+        # disparar uma eleicao
+        coordinator, term = data.get("current_coordinator"), data.get("term")
+        if term is None:
+            return
+        if coordinator is None or coordinator == self.node_id or coordinator == self.current_coordinator:
+            self._observe_term(term)
+            return
+        
+        power = data.get("coordinator_power")
+        newer = term > self.term or (term == self.term and (
+            self.current_coordinator is None
+            or (self.coordinator_power or 0, self.current_coordinator) < (power or 0, coordinator)
+        ))
+        if not newer:
+            return
+        
+        # So adota coordenador alcancavel: o proprio peer, um peer vivo ou
+        # confirmado com um heartbeat direto
+        reachable = coordinator == peer or self.peer_status.get(coordinator, {}).get("alive") or (
+            coordinator in self.peer_status and self._confirm_role(coordinator, "is_coordinator")
+        )
+        if not reachable:
+            return
+        
+        self._log(f"🔎 Coordenador {coordinator} (termo {term}) descoberto via heartbeat de {peer}")
+        self._accept_coordinator(coordinator, power, term)
+    
+    def _bump_version(self, peer: Optional[str] = None) -> int:
+        with self._state_lock:
+            self.state_version += 1
+            if peer is not None:
+                self.peer_versions[peer] = self.state_version
+            return self.state_version
+    
+    def _update_peer(self, peer: str, **fields):
+        status = self.peer_status[peer]
+        changed = any(
+            status.get(key) != value
+            for key, value in fields.items()
+            if key != "last_seen"
+        )
+        if self.recorder and changed:
+            power = fields.get("power_score", status.get("power_score"))
+            is_superpeer = fields.get("is_superpeer", status.get("is_superpeer"))
+            if power is not None and (power != status.get("power_score")
+                                      or is_superpeer != status.get("is_superpeer")):
+                self._trace_member(peer, power, is_superpeer)
+            if "alive" in fields and fields["alive"] != status.get("alive"):
+                self._trace(trace.RECOVER if fields["alive"] else trace.FAIL, peer, power=power)
+        status.update(fields)
+        if changed:
+            self._bump_version(peer)
+    
+    def _trace(self, event_type: int, src: Optional[str], dst: Optional[str] = None,
+               power: Optional[int] = None, role: int = trace.ROLE_UNKNOWN):
+        if self.recorder:
+            self.recorder.record(event_type, src, dst, power, role)
+    
+    def _trace_member(self, node: str, power: int, is_superpeer: bool):
+        # No modo hierarquico so superpeers disputam a eleicao global; o replay
+        # usa o papel para nao tratar pares comuns como candidatos
+        role = trace.ROLE_CANDIDATE if not self.hierarchical or is_superpeer else trace.ROLE_PEER
+        self._trace(trace.MEMBER, node, power=power, role=role)
+    
+    def _save_state(self):
+        if not self.state_file:
+            return
+        with self._save_lock:
+            version = self.state_version
+            if version == self._saved_version:
+                return
+            try:
+                save_snapshot(self.state_file, {
+                    "node_id": self.node_id,
+                    "power_score": self.power_score,
+                    "current_coordinator": self.current_coordinator,
+                    "coordinator_power": self.coordinator_power,
+                    "term": self.term,
+                    "group_superpeer": self.group_superpeer,
+                    "group": self.group,
+                    "id_reserved_until": self.id_reserved_until,
+                    "peer_status": {peer: dict(status) for peer, status in self.peer_status.items()},
+                    "saved_at": time.time()
+                })
+                self._saved_version = version
+            except OSError as e:
+                self._log(f"⚠️ Falha ao salvar snapshot: {e}")
+    
+    def _restore_state(self) -> bool:
+        snapshot = self._snapshot
+        self._snapshot = None
+        if not snapshot or time.time() - snapshot.get("saved_at", 0) > SNAPSHOT_MAX_AGE:
+            return False
+        
+        for peer, status in snapshot.get("peer_status", {}).items():
+            if peer in self.peer_status:
+                self.peer_status[peer].update(status)
+        
+        # Valida com um unico heartbeat se o superpeer/coordenador em cache
+        # ainda esta ativo antes de adotar
+        if self.hierarchical:
+            superpeer = snapshot.get("group_superpeer")
+            if superpeer not in self.group_members or not self._confirm_role(superpeer, "is_superpeer"):
+                return False
+            self.group_superpeer = superpeer
+        
+        coordinator = snapshot.get("current_coordinator")
+        if coordinator not in self.peer_status or not self._confirm_role(coordinator, "is_coordinator"):
+            return False
+        
+        self.current_coordinator = coordinator
+        self.coordinator_power = snapshot.get("coordinator_power")
+        self.coordinator_term = self.term
+        self._bump_version()
+        self._log(f"💾 Estado restaurado - coordenador {coordinator} ainda ativo, sem nova eleicao")
+        return True
+    
+    def _confirm_role(self, peer: str, role: str) -> bool:
+        try:
+            response = self.transport.get(peer, "/heartbeat", self._request_timeout(peer))
+            if response.status_code != 200:
+                return False
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError):
+            return False
+        
+        self._update_peer(
+            peer,
+            last_seen=time.time(),
+            alive=True,
+            power_score=data.get("power_score"),
+            is_superpeer=data.get("is_superpeer", False)
+        )
+        return bool(data.get(role))
+    
     def _log(self, message: str):
         timestamp = time.strftime("%H:%M:%S")
         print(f"[{timestamp}] [{self.node_id}] {message}")
@@ -104,144 +645,505 @@ class DistributedNode:
     def start(self):
         self.running = True
         
-        server_thread = threading.Thread(
-            target=lambda: self.app.run(
-                host=self.host, 
-                port=self.port, 
-                threaded=True,
-                use_reloader=False
-            ),
-            daemon=True
-        )
+        # make_server ja retorna com o socket em bind/listen: o no esta
+        # pronto para receber requisicoes assim que a thread inicia
+        self.server = make_server(self.host, self.port, self.app, threaded=True)
+        server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
         server_thread.start()
         
+        self._trace_member(self.node_id, self.power_score, self.is_superpeer)
         self._log(f"🚀 Servidor iniciado em {self.host}:{self.port}")
         self._log(f"⚡ Power Score: {self.power_score}")
         self._log(f"👥 Peers: {self.peers}")
         
-        time.sleep(1)
+        restored = self._restore_state()
         
         self.heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
         self.heartbeat_thread.start()
         
-        time.sleep(2)
-        if not self.current_coordinator:
+        if restored:
+            return
+        
+        # Aguarda a primeira rodada de heartbeats para conhecer os peers vivos
+        self.first_heartbeat_done.wait(STARTUP_WAIT_TIMEOUT)
+        if self.auto_group and self.group is None:
+            self._choose_group()
+        if self.hierarchical and not self.group_superpeer:
+            self._log(f"📢 Iniciando eleicao inicial do grupo {self.group}...")
+            self.start_election(SCOPE_GROUP)
+        elif not self.current_coordinator:
             self._log("📢 Iniciando eleicao inicial...")
             self.start_election()
     
     def stop(self):
         self.running = False
+        self._save_state()
+        if self.recorder:
+            self.recorder.close()
+        if self.server:
+            self.server.shutdown()
         self._log("🛑 No encerrado")
     
+    @property
+    def me(self) -> Candidate:
+        return Candidate(self.node_id, self.power_score)
+    
+    def _candidates(self, peers: List[str]) -> List[Candidate]:
+        return [Candidate(p, self.peer_status[p]["power_score"]) for p in peers]
+    
+    def _alive(self, peers: List[str]) -> List[str]:
+        return [p for p in peers if self.peer_status[p].get("alive")]
+    
+    def _monitored_peers(self) -> List[str]:
+        # Membros comuns so monitoram o proprio grupo; superpeers monitoram
+        # todos para descobrir os demais superpeers
+        # (peers de grupo ainda desconhecido tambem, ate o grupo ser aprendido)
+        if self.hierarchical and not self.is_superpeer:
+            return self.group_members + [p for p in self.peers if p not in self.peer_groups]
+        return self.peers
+    
+    def _election_candidates(self, scope: str) -> List[str]:
+        if not self.hierarchical:
+            return self.peers
+        if scope == SCOPE_GROUP:
+            return self.group_members
+        return [p for p in self.peers if self.peer_status[p].get("is_superpeer")]
+    
+    def _is_electing(self, scope: str) -> bool:
+        if scope == SCOPE_GROUP:
+            return self.group_election_in_progress
+        return self.election_in_progress
+    
+    def _set_electing(self, scope: str, value: bool):
+        if scope == SCOPE_GROUP:
+            self.group_election_in_progress = value
+        else:
+            self.election_in_progress = value
+        
+        # Acorda quem aguarda o anuncio do vencedor
+        if value:
+            self._election_done[scope].clear()
+        else:
+            self._election_done[scope].set()
+    
     def _heartbeat_loop(self):
-        while self.running:
-            for peer in self.peers:
-                try:
-                    response = requests.get(
-                        f"http://{peer}/heartbeat",
-                        timeout=REQUEST_TIMEOUT
-                    )
+        with ThreadPoolExecutor(max_workers=HEARTBEAT_WORKERS) as pool:
+            while self.running:
+                with profiler.span("heartbeat_round"):
+                    self._refresh_power()
+                    list(pool.map(self._check_peer, self._monitored_peers()))
+                    self.first_heartbeat_done.set()
+                    self._check_power_takeover()
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        was_alive = self.peer_status[peer]["alive"]
-                        
-                        self.peer_status[peer] = {
-                            "last_seen": time.time(),
-                            "alive": True,
-                            "power_score": data.get("power_score")
-                        }
-                        
-                        if not was_alive:
-                            self._log(f"✅ Peer {peer} online (power: {data.get('power_score')})")
-                    
-                except requests.exceptions.RequestException:
-                    was_alive = self.peer_status[peer].get("alive", False)
-                    self.peer_status[peer]["alive"] = False
-                    
-                    if was_alive:
-                        self._log(f"❌ Peer {peer} offline")
-                        
-                        if peer == self.current_coordinator:
-                            self._log(f"💥 Coordenador {peer} falhou! Nova eleicao...")
-                            threading.Thread(target=self.start_election, daemon=True).start()
+                    self._save_state()
+                time.sleep(HEARTBEAT_INTERVAL)
+    
+    def _probe(self, peer: str) -> Tuple[requests.Response, float]:
+        # Como na retransmissao do TCP: um timeout dobra o RTO e o heartbeat
+        # e repetido uma vez antes de o peer ser dado como morto
+        attempts = 2 if self.adaptive_timeouts else 1
+        for attempt in range(attempts):
+            try:
+                started = time.perf_counter()
+                response = self.transport.get(peer, "/heartbeat", self._request_timeout(peer))
+                return response, (time.perf_counter() - started) * 1000
+            except requests.exceptions.Timeout as e:
+                self._note_request_failure(peer, e)
+                if attempt == attempts - 1:
+                    raise
+    
+    def _check_peer(self, peer: str):
+        try:
+            response, rtt_ms = self._probe(peer)
             
-            time.sleep(HEARTBEAT_INTERVAL)
+            if response.status_code == 200:
+                data = response.json()
+                self._observe_rtt(peer, rtt_ms, data.get("coordinates"))
+                if data.get("group") is not None:
+                    self._learn_group(peer, data["group"])
+                was_alive = self.peer_status[peer]["alive"]
+                
+                self._update_peer(
+                    peer,
+                    last_seen=time.time(),
+                    alive=True,
+                    power_score=data.get("power_score"),
+                    is_superpeer=data.get("is_superpeer", False)
+                )
+                
+                if not was_alive:
+                    self._log(f"✅ Peer {peer} online (power: {data.get('power_score')})")
+                self._discover_coordinator(peer, data)
+            
+        except requests.exceptions.RequestException:
+            was_alive = self.peer_status[peer].get("alive", False)
+            self._update_peer(peer, alive=False)
+            
+            if was_alive:
+                self._log(f"❌ Peer {peer} offline")
+                
+                if self.hierarchical and peer == self.group_superpeer:
+                    self._log(f"💥 Superpeer {peer} falhou! Nova eleicao no grupo...")
+                    threading.Thread(target=self.start_election, args=(SCOPE_GROUP,), daemon=True).start()
+                elif peer == self.current_coordinator and (not self.hierarchical or self.is_superpeer):
+                    self.metrics["coordinator_failures_detected"] += 1
+                    self._log(f"💥 Coordenador {peer} falhou! Nova eleicao...")
+                    threading.Thread(target=self.start_election, daemon=True).start()
+        
+        except Exception as e:
+            # Resposta invalida (JSON malformado, campo inesperado) de um peer nao
+            # pode derrubar a thread de heartbeat; o peer e verificado na proxima rodada
+            self._log(f"⚠️ Heartbeat invalido de {peer}: {e!r}")
+    
+    def _reset_sequencer(self):
+        # Toda troca de coordenador descarta o alocador: ao voltar a ser
+        # coordenador, o no recomeca acima do maior teto conhecido
+        with self._allocator_lock:
+            self.id_allocator = None
+    
+    def _sequencer(self) -> Optional[BlockAllocator]:
+        # Um termo maior observado depois da eleicao indica outro coordenador
+        if not self.is_coordinator or self.coordinator_term != self.term:
+            self._reset_sequencer()
+            return None
+        with self._allocator_lock:
+            if self.id_allocator is None:
+                # Antes do primeiro bloco, recupera o maior teto de reserva
+                # conhecido pelos peers vivos (o antigo coordenador o replicou).
+                # Toda reserva aceita chegou a uma maioria, entao lendo uma
+                # maioria ao menos um no conhece o maior teto
+                term = self.term
+                with ThreadPoolExecutor(max_workers=HEARTBEAT_WORKERS) as pool:
+                    reads = [r for r in pool.map(self._peer_reservation, self._alive(self.peers))
+                             if r is not None]
+                votes, needed = len(reads) + 1, self._quorum()
+                if votes < needed:
+                    self._log(f"⚠️ Tetos de reserva lidos sem maioria ({votes}/{needed})")
+                    raise IdUnavailable(f"tetos de reserva lidos sem maioria ({votes}/{needed})")
+                start = max([self.id_reserved_until] + reads)
+                self.id_allocator = BlockAllocator(
+                    start, lambda reserved_until: self._replicate_reservation(reserved_until, term)
+                )
+                self._log(f"🔢 Sequenciador de IDs ativo a partir de {start} (termo {term})")
+            return self.id_allocator
+    
+    def _quorum(self) -> int:
+        # Maioria do cluster contando este no
+        return (len(self.peers) + 1) // 2 + 1
+    
+    def _peer_reservation(self, peer: str) -> Optional[int]:
+        # None quando o teto nao pode ser lido: uma falha nao vale como teto 0
+        try:
+            response = self.transport.get(peer, "/ids/state", self._request_timeout(peer))
+            if response.status_code != 200:
+                return None
+            return int(response.json()["reserved_until"])
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError):
+            return None
+    
+    def _replicate_reservation(self, reserved_until: int, term: int):
+        self._note_reservation(reserved_until)
+        payload = {"reserved_until": reserved_until, "coordinator": self.node_id, "term": term}
+        
+        def push(peer: str) -> Optional[int]:
+            # Retorna 0 no ack, o teto do peer quando ele recusa por teto maior
+            # ou igual, e None quando nao houve resposta valida
+            try:
+                response = self.transport.post(peer, "/ids/reserve", payload, self._request_timeout(peer))
+                if response.status_code == 200:
+                    return 0
+                if response.status_code == 409:
+                    return response.json().get("reserved_until")
+            except (requests.exceptions.RequestException, ValueError):
+                pass
+            return None
+        
+        with ThreadPoolExecutor(max_workers=HEARTBEAT_WORKERS) as pool:
+            replies = list(pool.map(push, self._alive(self.peers)))
+        acks = replies.count(0)
+        conflicts = [r for r in replies if r]
+        self._save_state()
+        
+        if conflicts:
+            # Algum peer ja conhece um teto igual ou maior: este alocador comecou
+            # baixo demais e e descartado; o proximo recomeca acima do teto
+            self._note_reservation(max(conflicts))
+            self._reset_sequencer()
+            self._log(f"⚠️ Reserva de IDs ate {reserved_until} recusada (teto conhecido: {max(conflicts)})")
+            raise IdUnavailable(f"teto de reserva conhecido pelos peers: {max(conflicts)}")
+        
+        # A reserva so vale com maioria do cluster (contando este no): um
+        # coordenador isolado por particao nao consegue estender o teto
+        votes, needed = acks + 1, self._quorum()
+        if votes < needed:
+            self._log(f"⚠️ Reserva de IDs ate {reserved_until} sem maioria ({votes}/{needed})")
+            raise IdUnavailable(f"reserva de IDs sem maioria ({votes}/{needed})")
+        self._log(f"🔢 Reserva de IDs ate {reserved_until} replicada para {acks} peers")
+    
+    def _note_reservation(self, reserved_until: int):
+        with self._state_lock:
+            if reserved_until <= self.id_reserved_until:
+                return
+            self.id_reserved_until = reserved_until
+        self._bump_version()
+    
+    def _fetch_id_block(self, count: int) -> Tuple[int, int]:
+        allocator = self._sequencer()
+        if allocator is not None:
+            block = allocator.lease(count)
+        else:
+            coordinator = self.current_coordinator
+            if not coordinator:
+                raise IdUnavailable("nenhum coordenador eleito")
+            response = self.transport.post(coordinator, "/ids/lease", {"count": count, "term": self.term},
+                                           self._request_timeout(coordinator))
+            data = response.json()
+            if response.status_code == 409:
+                self._observe_term(data.get("term"))
+            if response.status_code != 200:
+                raise IdUnavailable(data.get("error", f"HTTP {response.status_code}"))
+            block = (data["start"], data["end"])
+        self._note_reservation(block[1])
+        return block
+    
+    def _rtt_estimator(self, peer: str) -> RttEstimator:
+        estimator = self.rtt_estimators.get(peer)
+        if estimator is None:
+            estimator = self.rtt_estimators.setdefault(peer, RttEstimator())
+        return estimator
+    
+    def _request_timeout(self, peer: str, static: float = REQUEST_TIMEOUT) -> float:
+        # Sem amostras suficientes vale o timeout fixo do tipo de requisicao
+        # (ex.: ELECTION_TIMEOUT para ELECTION), nao o inicial do estimador
+        estimator = self._rtt_estimator(peer)
+        if not self.adaptive_timeouts or not estimator.ready:
+            return static
+        return estimator.rto
+    
+    def _election_timeout(self, candidates: List[str]) -> float:
+        # Espera pelo anuncio: o vencedor ainda precisa da propria rodada e do
+        # anuncio, entao o prazo acompanha o maior RTO entre os candidatos
+        estimators = [self._rtt_estimator(p) for p in candidates]
+        if not self.adaptive_timeouts or not all(e.ready for e in estimators):
+            return ELECTION_TIMEOUT
+        slowest = max((e.rto for e in estimators), default=ELECTION_TIMEOUT_MIN)
+        return min(max(slowest * ELECTION_TIMEOUT_FACTOR, ELECTION_TIMEOUT_MIN), ELECTION_TIMEOUT_MAX)
+    
+    def _note_request_failure(self, peer: str, error: Exception):
+        # So timeouts indicam RTO curto demais (conexao recusada nao)
+        if isinstance(error, requests.exceptions.Timeout):
+            self._rtt_estimator(peer).on_timeout()
+    
+    def _observe_rtt(self, peer: str, rtt_ms: float, coordinates: Optional[dict]):
+        estimator = self._rtt_estimator(peer)
+        estimator.observe(rtt_ms / 1000)
+        self.peer_rtt[peer] = estimator.srtt * 1000
+        if coordinates:
+            remote = VivaldiCoordinate.from_dict(coordinates)
+            self.peer_coordinates[peer] = remote
+            with self._coordinates_lock:
+                self.coordinates.update(rtt_ms, remote)
+    
+    def _estimated_rtt(self, peer: str) -> Optional[float]:
+        # RTT medido quando ha; senao, a distancia entre as coordenadas
+        if peer in self.peer_rtt:
+            return self.peer_rtt[peer]
+        remote = self.peer_coordinates.get(peer)
+        return self.coordinates.distance_to(remote) if remote else None
     
-    def start_election(self):
-        if self.election_in_progress:
+    def _learn_group(self, peer: str, group: int):
+        if self.peer_groups.get(peer) == group:
             return
+        self.peer_groups[peer] = group
+        if self.hierarchical:
+            if group == self.group and peer not in self.group_members:
+                self.group_members.append(peer)
+            elif group != self.group and peer in self.group_members:
+                self.group_members.remove(peer)
+        self._bump_version(peer)
+    
+    def _choose_group(self):
+        # Entra no grupo cujo superpeer (ou, sem superpeer conhecido, cujos
+        # membros) esta mais proximo em RTT
+        members_by_group: Dict[int, List[str]] = {}
+        for peer in self._alive(self.peers):
+            if peer in self.peer_groups:
+                members_by_group.setdefault(self.peer_groups[peer], []).append(peer)
         
-        self.election_in_progress = True
-        self._log(f"🗳️ Iniciando eleicao (meu power: {self.power_score})...")
+        best_group, best_rtt = None, None
+        for group, members in members_by_group.items():
+            superpeers = [p for p in members if self.peer_status[p].get("is_superpeer")]
+            rtts = [r for r in map(self._estimated_rtt, superpeers or members) if r is not None]
+            if not rtts:
+                continue
+            rtt = sum(rtts) / len(rtts)
+            if best_rtt is None or rtt < best_rtt:
+                best_group, best_rtt = group, rtt
         
-        higher_power_peers = []
-        for peer, status in self.peer_status.items():
-            if status["alive"] and status["power_score"] is not None:
-                if status["power_score"] > self.power_score:
-                    higher_power_peers.append(peer)
+        if best_group is None:
+            self._log("⚠️ Nenhum grupo conhecido, seguindo sem grupo")
+            return
         
-        if not higher_power_peers:
-            self._log("👑 Nenhum peer com power maior - me declarando COORDENADOR!")
-            self._announce_coordinator()
+        self.group = best_group
+        self.hierarchical = True
+        self.group_members = [p for p in self.peers if self.peer_groups.get(p) == best_group]
+        # Ao virar hierarquico os papeis gravados no trace mudam
+        self._trace_member(self.node_id, self.power_score, self.is_superpeer)
+        for peer in self.peers:
+            status = self.peer_status[peer]
+            if status.get("power_score") is not None:
+                self._trace_member(peer, status["power_score"], status.get("is_superpeer"))
+        self._bump_version()
+        self._log(f"📍 Grupo {best_group} escolhido por latencia (RTT ~{best_rtt:.1f} ms)")
+    
+    @profiled("election")
+    def start_election(self, scope: str = SCOPE_GLOBAL):
+        if self._is_electing(scope):
+            return
+        if scope == SCOPE_GLOBAL and self.hierarchical and not self.is_superpeer:
             return
         
-        received_ok = False
-        for peer in higher_power_peers:
-            try:
-                self._log(f"📤 Enviando ELECTION para {peer}...")
-                
-                response = requests.post(
-                    f"http://{peer}/election",
-                    json={"sender_id": self.node_id, "power_score": self.power_score},
-                    timeout=ELECTION_TIMEOUT
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get("response") == "OK":
-                        self._log(f"📥 Recebido OK de {peer}")
-                        received_ok = True
-                        break
-            
-            except requests.exceptions.RequestException:
-                self._log(f"⚠️ Falha ao contatar {peer}")
-                self.peer_status[peer]["alive"] = False
+        self._set_electing(scope, True)
+        if scope == SCOPE_GLOBAL:
+            self._trace(trace.START, self.node_id, power=self.power_score)
+            self.metrics["elections_started"] += 1
+            if self._election_started_at is None:
+                self._election_started_at = time.time()
+        self._bump_version()
+        self._log(f"🗳️ Iniciando eleicao {scope} (meu power: {self.power_score})...")
         
-        if not received_ok:
-            self._log("👑 Nenhuma resposta OK - me declarando COORDENADOR!")
-            self._announce_coordinator()
+        candidates = self._alive(self._election_candidates(scope))
+        election = BullyElection(HttpElectionTransport(self, scope))
+        result = election.run(
+            self.me,
+            self._candidates(candidates),
+            strongest_first=(self.election_mode == MODE_FAST)
+        )
+        
+        if result.winner is not None:
+            self._log("👑 Nenhuma resposta OK - me declarando vencedor!")
+            self._announce_winner(scope)
         else:
-            self._log("⏳ Aguardando anuncio de coordenador...")
-            time.sleep(ELECTION_TIMEOUT)
+            self._log("⏳ Aguardando anuncio do vencedor...")
+            self._election_done[scope].wait(self._election_timeout(candidates))
             
-            if self.election_in_progress:
+            if self._is_electing(scope):
                 self._log("⚠️ Timeout - reiniciando eleicao...")
-                self.election_in_progress = False
-                self.start_election()
+                self._set_electing(scope, False)
+                self.start_election(scope)
+    
+    def _refresh_power(self):
+        if self.power_provider is None:
+            return
+        power = self.power_provider.sample()
+        metrics = dict(self.power_provider.last_metrics)
+        if power != self.power_score:
+            self.power_score = power
+            self._trace_member(self.node_id, power, self.is_superpeer)
+        elif metrics == self._reported_metrics:
+            return
+        self._reported_metrics = metrics
+        self._bump_version()
+    
+    def _clearly_stronger_than(self, other_power: int, other_id: str) -> bool:
+        # Com power medido, pequenas variacoes nao devem derrubar o coordenador;
+        # no empate decide o node_id, como no rank() do nucleo
+        margin = POWER_HYSTERESIS_MARGIN if self.power_provider else 0.0
+        return (self.power_score, self.node_id) > (other_power * (1 + margin), other_id)
+    
+    def _check_power_takeover(self):
+        coordinator = self.current_coordinator
+        if self.power_provider is None or coordinator is None or coordinator == self.node_id:
+            return
+        if self.hierarchical and not self.is_superpeer:
+            return
+        
+        coordinator_power = self.peer_status.get(coordinator, {}).get("power_score") or self.coordinator_power
+        if coordinator_power is None or not self._clearly_stronger_than(coordinator_power, coordinator):
+            self._stronger_since = None
+            return
+        
+        now = time.time()
+        if self._stronger_since is None:
+            self._stronger_since = now
+        elif now - self._stronger_since >= POWER_HYSTERESIS_PERIOD:
+            self._stronger_since = None
+            self._log(f"📈 Power {self.power_score} supera o coordenador ({coordinator_power}) "
+                      f"ha {POWER_HYSTERESIS_PERIOD:.0f}s - iniciando eleicao...")
+            threading.Thread(target=self.start_election, daemon=True).start()
+    
+    def _record_election_end(self):
+        started_at = self._election_started_at
+        if started_at is not None:
+            self.metrics["last_election_latency"] = time.time() - started_at
+            self._election_started_at = None
+    
+    def _announce_winner(self, scope: str):
+        if scope == SCOPE_GROUP and self.hierarchical:
+            self._announce_superpeer()
+        else:
+            self._announce_coordinator()
+    
+    def _announce_superpeer(self):
+        if not self.is_superpeer:
+            self._trace_member(self.node_id, self.power_score, True)
+        self.is_superpeer = True
+        self.group_superpeer = self.node_id
+        self._set_electing(SCOPE_GROUP, False)
+        self._bump_version()
+        
+        self._log(f"⭐ SOU O SUPERPEER DO GRUPO {self.group}! (power: {self.power_score})")
+        
+        election = BullyElection(HttpElectionTransport(self, SCOPE_GROUP))
+        election.announce(self.me, self._candidates(self._alive(self.group_members)))
+        
+        # Descobre os superpeers dos outros grupos antes de disputar a eleicao
+        # global, que so ocorre se nao houver coordenador vivo mais forte
+        for peer in self.peers:
+            if peer not in self.group_members:
+                self._check_peer(peer)
+        
+        coordinator = self.current_coordinator
+        coordinator_alive = coordinator is not None and (
+            coordinator == self.node_id or self.peer_status.get(coordinator, {}).get("alive")
+        )
+        if not coordinator_alive or (self.coordinator_power or 0, coordinator) < (self.power_score, self.node_id):
+            self.start_election(SCOPE_GLOBAL)
+        elif self.group_members:
+            self._send_coordinator(self._alive(self.group_members), coordinator, self.coordinator_power, False)
     
     def _announce_coordinator(self):
+        with self._term_lock:
+            self.term += 1
         self.is_coordinator = True
         self.current_coordinator = self.node_id
-        self.election_in_progress = False
+        self.coordinator_power = self.power_score
+        self.coordinator_term = self.term
+        self._reset_sequencer()
+        self._set_electing(SCOPE_GLOBAL, False)
+        self._trace(trace.ELECTED, self.node_id, power=self.power_score)
+        self._record_election_end()
+        self._bump_version()
+        self._save_state()
         
-        self._log(f"🏆 SOU O COORDENADOR! (power: {self.power_score})")
+        self._log(f"🏆 SOU O COORDENADOR! (power: {self.power_score}, termo: {self.term})")
         
-        for peer in self.peers:
-            if self.peer_status[peer].get("alive"):
-                try:
-                    requests.post(
-                        f"http://{peer}/coordinator",
-                        json={
-                            "coordinator_id": self.node_id,
-                            "power_score": self.power_score
-                        },
-                        timeout=REQUEST_TIMEOUT
-                    )
-                    self._log(f"📢 Anunciado para {peer}")
-                
-                except requests.exceptions.RequestException:
-                    self._log(f"⚠️ Falha ao anunciar para {peer}")
+        if not self.hierarchical:
+            self._send_coordinator(self._alive(self.peers), self.node_id, self.power_score, False)
+            return
+        
+        # Anuncio desce pela arvore: coordenador -> superpeers -> membros
+        superpeers = [
+            p for p in self._alive(self.peers)
+            if self.peer_status[p].get("is_superpeer") and p not in self.group_members
+        ]
+        self._send_coordinator(superpeers, self.node_id, self.power_score, True)
+        self._send_coordinator(self._alive(self.group_members), self.node_id, self.power_score, False)
+    
+    def _send_coordinator(self, targets: List[str], coordinator_id: str,
+                          coordinator_power: Optional[int], forward: bool):
+        election = BullyElection(HttpElectionTransport(self, SCOPE_GLOBAL))
+        election.announce(Candidate(coordinator_id, coordinator_power), self._candidates(targets), forward=forward)
     
     def get_status_display(self) -> str:
         lines = []
@@ -249,7 +1151,9 @@ class DistributedNode:
         lines.append(f"  NO: {self.node_id}")
         lines.append(f"  Power Score: {self.power_score}")
         lines.append(f"  Coordenador: {'SIM 👑' if self.is_coordinator else 'NAO'}")
-        lines.append(f"  Coordenador Atual: {self.current_coordinator or 'Nenhum'}")
+        lines.append(f"  Coordenador Atual: {self.current_coordinator or 'Nenhum'} (termo: {self.term})")
+        if self.hierarchical:
+            lines.append(f"  Grupo: {self.group} (superpeer: {self.group_superpeer or 'Nenhum'})")
         lines.append("-" * 50)
         lines.append("  PEERS:")
         
@@ -257,11 +1161,24 @@ class DistributedNode:
             alive = "✅" if status["alive"] else "❌"
             power = status["power_score"] or "?"
             coord = " 👑" if peer == self.current_coordinator else ""
-            lines.append(f"    {alive} {peer} (power: {power}){coord}")
+            if status.get("is_superpeer"):
+                coord += " ⭐"
+            rtt = self.peer_rtt.get(peer)
+            if rtt is not None:
+                rtt = f", rtt: {rtt:.1f}ms, timeout: {self._request_timeout(peer) * 1000:.0f}ms"
+            else:
+                rtt = ""
+            lines.append(f"    {alive} {peer} (power: {power}{rtt}){coord}")
         
         lines.append("=" * 50)
         return "\n".join(lines)
 
 
-def create_node(host: str, port: int, peers: List[str], power_score: int = None) -> DistributedNode:
-    return DistributedNode(host, port, peers, power_score)
+def create_node(host: str, port: int, peers: List[str], power_score: int = None,
+                group: Optional[int] = None, peer_groups: Optional[Dict[str, int]] = None,
+                state_file: Optional[str] = None, transport=None,
+                election_mode: str = ELECTION_MODE, power_provider=None,
+                recorder=None, auto_group: bool = False,
+                adaptive_timeouts: bool = ADAPTIVE_TIMEOUTS) -> DistributedNode:
+    return DistributedNode(host, port, peers, power_score, group, peer_groups, state_file, transport,
+                           election_mode, power_provider, recorder, auto_group, adaptive_timeouts)
@@ -0,0 +1,79 @@
+import argparse
+import hashlib
+import os
+import sys
+
+# Modulos do simulador (v1) usados pelo no: a v1 e a unica fonte; as copias
+# desta pasta sao geradas por este script e nao devem ser editadas a mao
+SHARED_MODULES = ["election_core.py", "election_trace.py", "profiling.py", "coordinates.py"]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(HERE, "..", "eleicao-grande-escala")
+HEADER = "# Copia gerada por sync_shared.py a partir de eleicao-grande-escala/{name} (sha256 {digest}) - nao edite\n"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Copia os modulos compartilhados da v1 para a v2")
+    parser.add_argument("--check", action="store_true",
+                        help="Nao altera nada; falha se alguma copia divergir da v1 (ou do hash gravado)")
+    return parser.parse_args()
+
+
+def _digest(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _read(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def render(name: str, source: str) -> str:
+    return HEADER.format(name=name, digest=_digest(source)) + source
+
+
+def check_copy(name: str) -> str:
+    # Retorna o problema encontrado ou "" se a copia esta em dia
+    copy = _read(os.path.join(HERE, name))
+    if copy is None:
+        return "copia ausente"
+    header, _, body = copy.partition("\n")
+    if header + "\n" != HEADER.format(name=name, digest=_digest(body)):
+        return "copia editada a mao (hash do cabecalho nao confere)"
+    source = _read(os.path.join(SOURCE_DIR, name))
+    # Sem a pasta da v1 (distribuicao isolada) so da para validar o hash
+    if source is not None and copy != render(name, source):
+        return "diverge da v1"
+    return ""
+
+
+def main():
+    args = parse_args()
+    has_source = os.path.isdir(SOURCE_DIR)
+    
+    if args.check:
+        problems = [(name, check_copy(name)) for name in SHARED_MODULES]
+        problems = [(name, problem) for name, problem in problems if problem]
+        for name, problem in problems:
+            print(f"✗ {name}: {problem}")
+        origin = "v1" if has_source else "hash gravado (v1 ausente)"
+        print(f"{len(SHARED_MODULES)} modulos compartilhados verificados contra {origin}, "
+              f"{len(problems)} com problema")
+        sys.exit(1 if problems else 0)
+    
+    if not has_source:
+        sys.exit(f"Pasta da v1 nao encontrada: {os.path.normpath(SOURCE_DIR)}")
+    for name in SHARED_MODULES:
+        content = render(name, _read(os.path.join(SOURCE_DIR, name)))
+        path = os.path.join(HERE, name)
+        if _read(path) == content:
+            continue
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        print(f"🔄 {name} atualizado")
+
+
+if __name__ == "__main__":
+    main()
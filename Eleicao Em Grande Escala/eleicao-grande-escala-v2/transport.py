@@ -0,0 +1,155 @@
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+
+import requests
+
+
+class HttpTransport:
+    
+    def __init__(self):
+        # Uma Session por thread: reaproveita conexoes sem compartilhar
+        # estado entre as threads de heartbeat e de eleicao
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+    
+    def get(self, peer: str, path: str, timeout: float) -> requests.Response:
+        return self.session.get(f"http://{peer}{path}", timeout=timeout)
+    
+    def post(self, peer: str, path: str, payload: dict, timeout: float) -> requests.Response:
+        return self.session.post(f"http://{peer}{path}", json=payload, timeout=timeout)
+
+
+@dataclass
+class LinkFault:
+    latency: float = 0.0
+    jitter: float = 0.0
+    drop: float = 0.0
+    partitioned: bool = False
+
+
+TRUE_VALUES = {"true", "1", "yes", "on"}
+FALSE_VALUES = {"false", "0", "no", "off"}
+
+
+def _parse_bool(key: str, value) -> bool:
+    # bool("false") e True: valores vindos do JSON/CLI sao interpretados pelo texto
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Valor invalido para {key}: {value!r}")
+
+
+def _parse_field(fault: LinkFault, key: str, value):
+    if key not in LinkFault.__dataclass_fields__:
+        raise ValueError(f"Parametro de falha desconhecido: {key}")
+    if isinstance(getattr(fault, key), bool):
+        return _parse_bool(key, value)
+    if isinstance(value, bool):
+        raise ValueError(f"Valor invalido para {key}: {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Valor invalido para {key}: {value!r}") from None
+    # NaN/inf chegariam ao time.sleep do apply; drop e uma probabilidade
+    if not math.isfinite(number) or number < 0 or (key == "drop" and number > 1):
+        limits = "entre 0 e 1" if key == "drop" else "finito e >= 0"
+        raise ValueError(f"Valor invalido para {key}: {value!r} (deve ser {limits})")
+    return number
+
+
+class FaultInjector:
+    # Regras por par (origem, destino); "*" vale para qualquer no
+    
+    def __init__(self, seed: Optional[int] = None):
+        self.rules: Dict[Tuple[str, str], LinkFault] = {}
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def set_fault(self, src: str = "*", dst: str = "*", **fields) -> LinkFault:
+        with self._lock:
+            fault = self.rules.get((src, dst), LinkFault())
+            # Valida todos os campos antes de alterar a regra
+            parsed = {key: _parse_field(fault, key, value) for key, value in fields.items()}
+            for key, value in parsed.items():
+                setattr(fault, key, value)
+            self.rules[(src, dst)] = fault
+            return fault
+    
+    def partition(self, group_a, group_b):
+        for a in group_a:
+            for b in group_b:
+                self.set_fault(a, b, partitioned=True)
+                self.set_fault(b, a, partitioned=True)
+    
+    def clear(self, src: Optional[str] = None):
+        with self._lock:
+            if src is None:
+                self.rules.clear()
+            else:
+                self.rules = {k: v for k, v in self.rules.items() if k[0] != src}
+    
+    def lookup(self, src: str, dst: str) -> Optional[LinkFault]:
+        for key in ((src, dst), (src, "*"), ("*", dst), ("*", "*")):
+            fault = self.rules.get(key)
+            if fault is not None:
+                return fault
+        return None
+    
+    def describe(self, src: Optional[str] = None) -> list:
+        return [
+            {"src": s, "dst": d, **asdict(fault)}
+            for (s, d), fault in list(self.rules.items())
+            if src is None or s in (src, "*")
+        ]
+    
+    def apply(self, src: str, dst: str, timeout: float):
+        fault = self.lookup(src, dst)
+        if fault is None:
+            return
+        
+        # Mensagem perdida ou link particionado: o remetente so percebe
+        # depois de esperar o timeout inteiro, como numa rede real
+        if fault.partitioned or (fault.drop and self.random.random() < fault.drop):
+            time.sleep(timeout)
+            raise requests.exceptions.Timeout(f"Falha injetada {src} -> {dst}")
+        
+        delay = fault.latency
+        if fault.jitter:
+            delay += self.random.uniform(-fault.jitter, fault.jitter)
+        delay = max(delay, 0.0)
+        if delay >= timeout:
+            time.sleep(timeout)
+            raise requests.exceptions.Timeout(f"Latencia injetada {src} -> {dst}")
+        if delay:
+            time.sleep(delay)
+
+
+class FaultInjectingTransport:
+    
+    def __init__(self, src: str, injector: Optional[FaultInjector] = None,
+                 inner: Optional[HttpTransport] = None):
+        self.src = src
+        self.injector = injector or FaultInjector()
+        self.inner = inner or HttpTransport()
+    
+    def get(self, peer: str, path: str, timeout: float) -> requests.Response:
+        self.injector.apply(self.src, peer, timeout)
+        return self.inner.get(peer, path, timeout)
+    
+    def post(self, peer: str, path: str, payload: dict, timeout: float) -> requests.Response:
+        self.injector.apply(self.src, peer, timeout)
+        return self.inner.post(peer, path, payload, timeout)
@@ -0,0 +1,81 @@
+"""
+bench_build.py - Mede a criação de redes grandes
+
+Compara a criação sequencial (create_network) com a criação em shards
+(create_network_parallel) para 1 e N workers, separando o tempo até a
+rede estar pronta para a eleição global do tempo de criar todos os peers
+(primeiro acesso às listas de peers).
+
+Uso:
+    python bench_build.py --groups 3000 --peers 50 --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+
+from network_simulator import NetworkSimulator
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mede a criação sequencial e paralela da rede")
+    parser.add_argument("--groups", type=int, default=3000, help="Quantidade de grupos")
+    parser.add_argument("--peers", type=int, default=50, help="Peers por grupo")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Workers do modo paralelo")
+    parser.add_argument("--shard-groups", type=int, default=250, help="Grupos por shard")
+    return parser.parse_args()
+
+
+def measure(build) -> tuple:
+    """Retorna (tempo até a rede pronta, tempo para criar todos os peers, simulador)."""
+    random.seed(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        simulator = build()
+        ready = time.perf_counter() - started
+        for superpeer in simulator.superpeers:
+            superpeer.peers
+        total = time.perf_counter() - started
+    return ready, total, simulator
+
+
+def main():
+    args = parse_args()
+    
+    def sequential():
+        simulator = NetworkSimulator(num_groups=args.groups, peers_per_group=args.peers)
+        simulator.create_network()
+        return simulator
+    
+    def parallel(workers):
+        def build():
+            simulator = NetworkSimulator(num_groups=args.groups, peers_per_group=args.peers)
+            simulator.create_network_parallel(workers=workers, shard_groups=args.shard_groups)
+            return simulator
+        return build
+    
+    runs = [("Sequencial (create_network)", sequential),
+            ("Paralelo, 1 worker", parallel(1))]
+    if args.workers > 1:
+        runs.append((f"Paralelo, {args.workers} workers", parallel(args.workers)))
+    
+    print("=" * 70)
+    print(f"  {args.groups} grupos x {args.peers} peers = {args.groups * args.peers} nós "
+          f"({os.cpu_count()} CPUs)")
+    print("-" * 70)
+    print(f"  {'Modo':<32}{'Rede pronta':>14}{'Todos os peers':>18}")
+    baseline = None
+    for name, build in runs:
+        ready, total, simulator = measure(build)
+        stats = simulator.get_network_stats()
+        baseline = baseline or ready
+        print(f"  {name:<32}{ready:>12.3f}s{total:>16.3f}s   "
+              f"({baseline / ready:.1f}x, {stats['total_peers']} nós)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
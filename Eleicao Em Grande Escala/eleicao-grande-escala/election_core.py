@@ -0,0 +1,195 @@
+"""
+election_core.py - Núcleo do algoritmo Bully independente de transporte
+
+Este módulo concentra a lógica do algoritmo Bully (ELECTION / OK / COORDINATOR)
+sem depender de como as mensagens trafegam. O simulador usa o transporte em
+memória (InMemoryTransport) e o nó distribuído da v2 usa um transporte HTTP,
+de modo que a mesma implementação roda nos dois ambientes.
+
+Os candidatos são quaisquer objetos com os atributos node_id e power_score
+(por exemplo, Superpeer na simulação ou Candidate no nó HTTP).
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+from election_trace import COORDINATOR, ELECTION, OK
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """Identificação mínima de um participante da eleição."""
+    node_id: str
+    power_score: int
+
+
+def rank(candidate) -> tuple:
+    """
+    Ordem total dos participantes: power_score e, no empate, node_id.
+    
+    Com powers iguais, comparar só o power faria ninguém responder OK e
+    mais de um participante se declarar vencedor.
+    """
+    return (candidate.power_score, candidate.node_id)
+
+
+@dataclass
+class ElectionResult:
+    """
+    Resultado de uma rodada do algoritmo para um participante.
+    
+    Attributes:
+        winner: Participante vencedor (quando ninguém mais forte respondeu)
+        answered_by: Participante que respondeu OK e assume a eleição
+    """
+    winner: Optional[object] = None
+    answered_by: Optional[object] = None
+
+
+class ElectionTransport:
+    """
+    Interface de transporte das mensagens de eleição.
+    
+    Implementações entregam as mensagens ELECTION e COORDINATOR e informam
+    se o destino respondeu OK.
+    """
+    
+    def send_election(self, sender, target) -> bool:
+        """Envia ELECTION para target; retorna True se target respondeu OK."""
+        raise NotImplementedError
+    
+    def send_coordinator(self, coordinator, target, **extra) -> bool:
+        """Envia COORDINATOR para target; retorna True se foi entregue."""
+        raise NotImplementedError
+
+
+class InMemoryTransport(ElectionTransport):
+    """
+    Transporte em memória usado pelo simulador.
+    
+    Os participantes são os próprios objetos da simulação (sem cópia nem
+    serialização); um destino falho (is_alive=False) equivale a um timeout.
+    
+    Attributes:
+        messages: Contagem de mensagens enviadas por tipo
+        latency_ms: Latência simulada de um salto de mensagem
+        timeout_ms: Tempo simulado de espera por um destino falho
+        elapsed_ms: Tempo simulado acumulado pelas trocas sequenciais
+        exchanges: Quantidade de trocas ELECTION sequenciais (rodadas)
+        recorder: TraceRecorder opcional que grava cada mensagem
+    """
+    
+    def __init__(self, on_message: Optional[Callable[[str], None]] = None,
+                 latency_ms: float = 0.0, timeout_ms: float = 0.0, recorder=None):
+        self.on_message = on_message
+        self.recorder = recorder
+        self.messages: Counter = Counter()
+        self.latency_ms = latency_ms
+        self.timeout_ms = timeout_ms
+        self.elapsed_ms = 0.0
+        self.exchanges = 0
+    
+    def _log(self, message: str) -> None:
+        if self.on_message:
+            self.on_message(message)
+    
+    def send_election(self, sender, target) -> bool:
+        self.messages["ELECTION"] += 1
+        self.exchanges += 1
+        if self.recorder:
+            self.recorder.record(ELECTION, sender.node_id, target.node_id, sender.power_score)
+        self._log(f"{sender.node_id} → enviando ELECTION para {target.node_id} (power: {target.power_score})")
+        
+        if not getattr(target, "is_alive", True):
+            self.elapsed_ms += self.timeout_ms
+            self._log(f"{sender.node_id} → timeout aguardando {target.node_id}")
+            return False
+        
+        self.elapsed_ms += 2 * self.latency_ms
+        if not BullyElection.should_answer(target, sender):
+            return False
+        
+        self.messages["OK"] += 1
+        if self.recorder:
+            self.recorder.record(OK, target.node_id, sender.node_id, target.power_score)
+        self._log(f"{target.node_id} → respondendo OK para {sender.node_id}")
+        return True
+    
+    def send_coordinator(self, coordinator, target, **extra) -> bool:
+        self.messages["COORDINATOR"] += 1
+        if self.recorder:
+            self.recorder.record(COORDINATOR, coordinator.node_id, target.node_id, coordinator.power_score)
+        self._log(f"{coordinator.node_id} → enviando COORDINATOR para {target.node_id}")
+        return getattr(target, "is_alive", True)
+    
+    def reset(self) -> None:
+        """Zera os contadores de mensagens e o tempo simulado."""
+        self.messages.clear()
+        self.elapsed_ms = 0.0
+        self.exchanges = 0
+
+
+class BullyElection:
+    """
+    Algoritmo Bully desacoplado do transporte.
+    
+    Cada chamada de run() executa a rodada de um participante:
+    envia ELECTION para os candidatos mais fortes, em ordem, até receber OK.
+    Quem responde OK assume a eleição e executa sua própria rodada; quem não
+    recebe OK vence e anuncia com announce().
+    """
+    
+    def __init__(self, transport: ElectionTransport):
+        self.transport = transport
+    
+    @staticmethod
+    def should_answer(receiver, sender) -> bool:
+        """Um participante responde OK apenas a quem está abaixo dele em rank()."""
+        return rank(receiver) > rank(sender)
+    
+    @staticmethod
+    def higher_candidates(me, candidates: Iterable) -> List:
+        """Retorna os candidatos acima de me em rank()."""
+        return [
+            c for c in candidates
+            if c.power_score is not None
+            and rank(c) > rank(me) and c.node_id != me.node_id
+        ]
+    
+    def run(self, me, candidates: Iterable, strongest_first: bool = False) -> ElectionResult:
+        """
+        Executa a rodada de eleição de me.
+        
+        Args:
+            me: Participante que está conduzindo a rodada
+            candidates: Participantes conhecidos (vivos) na eleição
+            strongest_first: Bully modificado - contata primeiro o candidato
+                de maior power conhecido e desce a lista só em caso de timeout,
+                evitando a cascata de eleições do Bully clássico
+        
+        Returns:
+            ElectionResult com o vencedor ou com quem respondeu OK
+        """
+        targets = self.higher_candidates(me, candidates)
+        if strongest_first:
+            targets.sort(key=rank, reverse=True)
+        
+        for target in targets:
+            if self.transport.send_election(me, target):
+                return ElectionResult(answered_by=target)
+        return ElectionResult(winner=me)
+    
+    def announce(self, coordinator, targets: Iterable, **extra) -> int:
+        """
+        Envia COORDINATOR para todos os alvos.
+        
+        Returns:
+            Quantidade de anúncios entregues
+        """
+        delivered = 0
+        for target in targets:
+            if target.node_id != coordinator.node_id:
+                if self.transport.send_coordinator(coordinator, target, **extra):
+                    delivered += 1
+        return delivered
@@ -6,8 +6,13 @@ Baseado no algoritmo Bully adaptado para superpeers.
 """
 
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional
 from superpeer import Superpeer
+from election_core import BullyElection, ElectionTransport, InMemoryTransport
+from election_strategies import BullyStrategy, ElectionOutcome, ElectionStrategy
+from election_trace import ELECTED, MEMBER, ROLE_CANDIDATE, START, TraceRecorder
+from profiling import profiled
+from hash_ring import ConsistentHashRing
 
 
 class ElectionMessage:
@@ -42,17 +47,105 @@ class ElectionManager:
         current_coordinator: Superpeer que é o coordenador atual
         election_in_progress: Flag indicando eleição em andamento
         message_log: Log de todas as mensagens trocadas
+        transport: Transporte das mensagens (em memória por padrão)
+        core: Núcleo do algoritmo Bully compartilhado com o nó HTTP
+        strategy: Algoritmo de eleição usado (Bully por padrão)
+        last_outcome: Métricas da última eleição (mensagens, rodadas, latência)
+        recorder: TraceRecorder opcional para gravar a execução
+        ring: Anel de hash consistente da liderança particionada (None = coordenador único)
     """
     
-    def __init__(self, superpeers: List[Superpeer]):
+    def __init__(self, superpeers: List[Superpeer], transport: Optional[ElectionTransport] = None,
+                 strategy: Optional[ElectionStrategy] = None, recorder: Optional[TraceRecorder] = None):
         self.superpeers = superpeers
         self.current_coordinator: Optional[Superpeer] = None
         self.election_in_progress = False
         self.message_log: List[str] = []
+        self.transport = transport or InMemoryTransport(on_message=self.log)
+        self.core = BullyElection(self.transport)
+        self.strategy = strategy or BullyStrategy(core=self.core)
+        if self.strategy.on_message is None:
+            self.strategy.on_message = self.log
+        self.last_outcome: Optional[ElectionOutcome] = None
+        self.recorder: Optional[TraceRecorder] = None
+        if recorder:
+            self.attach_recorder(recorder)
+        
+        # Liderança particionada (ver enable_sharding)
+        self.ring: Optional[ConsistentHashRing] = None
+        self._superpeer_index: Dict[str, Superpeer] = {}
+        
+        self.link_superpeers()
+    
+    def link_superpeers(self) -> None:
+        """Configura referências entre superpeers (refeito quando os grupos mudam)."""
+        for sp in self.superpeers:
+            # Lista compartilhada: O(n) em vez de uma cópia por superpeer
+            sp.superpeer_directory = self.superpeers
+        self._superpeer_index = {sp.node_id: sp for sp in self.superpeers}
+        if self.ring is not None:
+            self.sync_ring()
+    
+    def enable_sharding(self, vnodes_per_power: float = 1.0) -> ConsistentHashRing:
+        """
+        Ativa a liderança particionada: o espaço de chaves é dividido entre os
+        superpeers ativos por um anel de hash consistente, com nós virtuais
+        proporcionais ao power_score, em vez de um único coordenador global.
+        
+        Args:
+            vnodes_per_power: Nós virtuais por ponto de power_score
         
-        # Configura referências entre superpeers
-        for sp in superpeers:
-            sp.other_superpeers = [s for s in superpeers if s.node_id != sp.node_id]
+        Returns:
+            O anel criado
+        """
+        self.ring = ConsistentHashRing(vnodes_per_power)
+        for sp in self.get_active_superpeers():
+            self.ring.add(sp.node_id, sp.power_score)
+        self.log(f"Liderança particionada ativa: {len(self.ring)} superpeers no anel")
+        return self.ring
+    
+    def leader_for(self, key: str) -> Optional[Superpeer]:
+        """Líder da chave: dono no anel (modo particionado) ou o coordenador global."""
+        if self.ring is None:
+            return self.current_coordinator
+        owner = self.ring.owner(key)
+        return self._superpeer_index.get(owner) if owner else None
+    
+    def sync_ring(self) -> float:
+        """
+        Retira do anel os superpeers falhos e inclui os ativos que faltam, sem
+        eleição global: só as faixas desses superpeers mudam de líder.
+        
+        Returns:
+            Fração do espaço de chaves que mudou de líder
+        """
+        before = self.ring.ownership()
+        live = {sp.node_id: sp for sp in self.get_active_superpeers()}
+        moved = 0.0
+        
+        for node_id, share in before.items():
+            if node_id not in live:
+                self.ring.remove(node_id)
+                moved += share
+                self.log(f"{node_id} saiu do anel → suas faixas ({share:.1%}) passam aos sucessores")
+        
+        joined = [sp for node_id, sp in live.items() if node_id not in self.ring]
+        for sp in joined:
+            self.ring.add(sp.node_id, sp.power_score)
+        if joined:
+            after = self.ring.ownership()
+            for sp in joined:
+                moved += after[sp.node_id]
+                self.log(f"{sp.node_id} entrou no anel → assume {after[sp.node_id]:.1%} das chaves")
+        return moved
+    
+    def attach_recorder(self, recorder: TraceRecorder) -> None:
+        """Passa a gravar as mensagens de eleição no trace binário."""
+        self.recorder = recorder
+        if isinstance(self.transport, InMemoryTransport):
+            self.transport.recorder = recorder
+        for sp in self.superpeers:
+            recorder.record(MEMBER, sp.node_id, power=sp.power_score, role=ROLE_CANDIDATE)
     
     def log(self, message: str) -> None:
         """Registra mensagem no log."""
@@ -63,6 +156,7 @@ class ElectionManager:
         """Retorna lista de superpeers ativos."""
         return [sp for sp in self.superpeers if sp.is_alive]
     
+    @profiled("election")
     def start_election(self, initiator: Superpeer) -> Optional[Superpeer]:
         """
         Inicia processo de eleição a partir de um superpeer.
@@ -79,73 +173,27 @@ class ElectionManager:
         
         self.election_in_progress = True
         self.log(f"{initiator.node_id} ({initiator.power_score}) → iniciando ELEIÇÃO")
+        if self.recorder:
+            self.recorder.record(START, initiator.node_id, power=initiator.power_score)
         
         # Remove coordenador anterior
         if self.current_coordinator:
             self.current_coordinator.resign_coordinator()
         
-        # Encontra superpeers com power_score MAIOR
-        higher_power_peers = [
-            sp for sp in self.get_active_superpeers()
-            if sp.power_score > initiator.power_score and sp.node_id != initiator.node_id
-        ]
-        
-        if not higher_power_peers:
-            # Não há superpeer com power maior - iniciador vence
-            self.log(f"{initiator.node_id} → não há superpeer com power maior")
-            self.announce_coordinator(initiator)
-            self.election_in_progress = False
-            return initiator
-        
-        # Envia ELECTION para superpeers com power maior
-        received_ok = False
-        for target in higher_power_peers:
-            self.log(f"{initiator.node_id} → enviando ELECTION para {target.node_id} (power: {target.power_score})")
-            
-            # Simula resposta OK do target
-            if target.is_alive:
-                self.log(f"{target.node_id} → respondendo OK para {initiator.node_id}")
-                received_ok = True
-                
-                # O target agora assume a eleição
-                return self.continue_election(target)
-        
-        if not received_ok:
-            # Nenhuma resposta - iniciador se torna coordenador
-            self.log(f"{initiator.node_id} → timeout, nenhuma resposta recebida")
-            self.announce_coordinator(initiator)
-            self.election_in_progress = False
-            return initiator
-        
-        return None
+        self.strategy.reset()
+        return self.continue_election(initiator)
     
     def continue_election(self, superpeer: Superpeer) -> Superpeer:
         """
-        Continua eleição a partir de um superpeer que respondeu OK.
-        Este superpeer agora tenta encontrar outro com power maior.
+        Conduz a eleição a partir de um superpeer usando a estratégia
+        configurada (no Bully, cada superpeer que responde OK assume a
+        eleição até que nenhum superpeer mais forte responda).
         """
-        higher_power_peers = [
-            sp for sp in self.get_active_superpeers()
-            if sp.power_score > superpeer.power_score and sp.node_id != superpeer.node_id
-        ]
-        
-        if not higher_power_peers:
-            # Este superpeer tem o maior power - vence a eleição
-            self.log(f"{superpeer.node_id} ({superpeer.power_score}) → não há superpeer com power maior")
-            self.announce_coordinator(superpeer)
-            self.election_in_progress = False
-            return superpeer
-        
-        # Continua a corrente de eleição
-        for target in higher_power_peers:
-            self.log(f"{superpeer.node_id} → verificando {target.node_id} (power: {target.power_score})")
-            if target.is_alive:
-                return self.continue_election(target)
-        
-        # Se chegou aqui, todos os maiores falharam
-        self.announce_coordinator(superpeer)
+        coordinator = self.strategy.elect(superpeer, self.get_active_superpeers())
+        self.announce_coordinator(coordinator)
+        self.last_outcome = self.strategy.outcome(coordinator)
         self.election_in_progress = False
-        return superpeer
+        return coordinator
     
     def announce_coordinator(self, coordinator: Superpeer) -> None:
         """
@@ -153,11 +201,11 @@ class ElectionManager:
         """
         self.current_coordinator = coordinator
         coordinator.set_as_coordinator()
+        if self.recorder:
+            self.recorder.record(ELECTED, coordinator.node_id, power=coordinator.power_score)
         
         # Envia mensagem COORDINATOR para todos
-        for sp in self.get_active_superpeers():
-            if sp.node_id != coordinator.node_id:
-                self.log(f"{coordinator.node_id} → enviando COORDINATOR para {sp.node_id}")
+        self.strategy.announce(coordinator, self.get_active_superpeers())
     
     def detect_coordinator_failure(self) -> bool:
         """
@@ -170,6 +218,7 @@ class ElectionManager:
             return True
         return not self.current_coordinator.is_alive
     
+    @profiled()
     def handle_coordinator_failure(self) -> Optional[Superpeer]:
         """
         Trata falha do coordenador atual iniciando nova eleição.
@@ -0,0 +1,334 @@
+"""
+election_strategies.py - Estratégias de eleição plugáveis
+
+Este módulo define a interface ElectionStrategy usada pelo ElectionManager e
+quatro algoritmos de eleição entre superpeers:
+
+- BullyStrategy: Bully adaptado (núcleo compartilhado de election_core)
+- RingStrategy: eleição em anel, a mensagem circula coletando candidatos
+- ModifiedBullyStrategy: convite direto ao superpeer mais forte conhecido
+- TreeStrategy: agregação do máximo em uma árvore geradora
+
+Todas contabilizam mensagens, rodadas sequenciais e latência simulada, o que
+permite comparar os algoritmos sobre a mesma topologia.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from election_core import BullyElection, InMemoryTransport, rank
+
+
+@dataclass
+class ElectionOutcome:
+    """
+    Resultado medido de uma eleição.
+    
+    Attributes:
+        strategy: Nome da estratégia usada
+        coordinator: Superpeer eleito (None se não houver superpeer ativo)
+        messages: Total de mensagens enviadas (eleição + anúncio)
+        rounds: Quantidade de etapas sequenciais de comunicação
+        latency_ms: Latência simulada até todos conhecerem o coordenador
+    """
+    strategy: str
+    coordinator: Optional[object]
+    messages: int
+    rounds: int
+    latency_ms: float
+
+
+def _is_alive(node) -> bool:
+    return getattr(node, "is_alive", True)
+
+
+class ElectionStrategy:
+    """
+    Interface das estratégias de eleição.
+    
+    Subclasses implementam elect() (escolha do coordenador) e announce()
+    (divulgação do resultado), registrando custos com _exchange(), _hop()
+    e _broadcast().
+    
+    Attributes:
+        latency_ms: Latência simulada de um salto de mensagem
+        timeout_ms: Tempo simulado de espera por um nó falho
+    """
+    name = "base"
+    
+    def __init__(self, latency_ms: float = 10.0, timeout_ms: float = 1000.0,
+                 on_message: Optional[Callable[[str], None]] = None):
+        self.latency_ms = latency_ms
+        self.timeout_ms = timeout_ms
+        self.on_message = on_message
+        self.messages: Counter = Counter()
+        self.rounds = 0
+        self.elapsed_ms = 0.0
+    
+    def reset(self) -> None:
+        """Zera os contadores antes de uma nova eleição."""
+        self.messages.clear()
+        self.rounds = 0
+        self.elapsed_ms = 0.0
+    
+    def _log(self, message: str) -> None:
+        if self.on_message:
+            self.on_message(message)
+    
+    def _exchange(self, msg_type: str, sender, target) -> bool:
+        """Requisição com resposta; destino falho custa um timeout."""
+        self.messages[msg_type] += 1
+        self.rounds += 1
+        self._log(f"{sender.node_id} → enviando {msg_type} para {target.node_id} (power: {target.power_score})")
+        if not _is_alive(target):
+            self.elapsed_ms += self.timeout_ms
+            self._log(f"{sender.node_id} → timeout aguardando {target.node_id}")
+            return False
+        self.messages["OK"] += 1
+        self.elapsed_ms += 2 * self.latency_ms
+        return True
+    
+    def _hop(self, msg_type: str, sender, target) -> bool:
+        """Mensagem sequencial de um salto; destino falho custa um timeout."""
+        self.messages[msg_type] += 1
+        self.rounds += 1
+        if not _is_alive(target):
+            self.elapsed_ms += self.timeout_ms
+            self._log(f"{sender.node_id} → {target.node_id} não responde, pulando")
+            return False
+        self.elapsed_ms += self.latency_ms
+        return True
+    
+    def _broadcast(self, msg_type: str, sender, targets: List) -> None:
+        """Mensagens enviadas em paralelo: um único salto de latência."""
+        targets = [t for t in targets if t.node_id != sender.node_id]
+        if not targets:
+            return
+        for target in targets:
+            self.messages[msg_type] += 1
+            self._log(f"{sender.node_id} → enviando {msg_type} para {target.node_id}")
+        self.rounds += 1
+        self.elapsed_ms += self.latency_ms
+    
+    def elect(self, initiator, superpeers: List):
+        """Escolhe o coordenador a partir de initiator; retorna o vencedor."""
+        raise NotImplementedError
+    
+    def announce(self, coordinator, superpeers: List) -> None:
+        """Divulga o coordenador; por padrão, difusão direta a todos."""
+        self._broadcast("COORDINATOR", coordinator, superpeers)
+    
+    def run(self, initiator, superpeers: List) -> ElectionOutcome:
+        """Executa eleição e anúncio, retornando as métricas medidas."""
+        self.reset()
+        coordinator = self.elect(initiator, superpeers)
+        if coordinator is not None:
+            self.announce(coordinator, superpeers)
+        return self.outcome(coordinator)
+    
+    def outcome(self, coordinator) -> ElectionOutcome:
+        """Monta o ElectionOutcome com os contadores atuais."""
+        return ElectionOutcome(
+            strategy=self.name,
+            coordinator=coordinator,
+            messages=sum(self.messages.values()),
+            rounds=self.rounds,
+            latency_ms=self.elapsed_ms
+        )
+
+
+class BullyStrategy(ElectionStrategy):
+    """
+    Bully adaptado: cada superpeer que responde OK assume a eleição até que
+    nenhum mais forte responda. Usa o núcleo BullyElection e seu transporte.
+    """
+    name = "bully"
+    
+    def __init__(self, core: Optional[BullyElection] = None, latency_ms: float = 10.0,
+                 timeout_ms: float = 1000.0, on_message: Optional[Callable[[str], None]] = None):
+        super().__init__(latency_ms, timeout_ms, on_message)
+        self.core = core or BullyElection(InMemoryTransport(
+            on_message=on_message, latency_ms=latency_ms, timeout_ms=timeout_ms
+        ))
+    
+    @property
+    def transport(self) -> InMemoryTransport:
+        return self.core.transport
+    
+    def reset(self) -> None:
+        super().reset()
+        if isinstance(self.transport, InMemoryTransport):
+            self.transport.reset()
+    
+    def elect(self, initiator, superpeers: List):
+        current = initiator
+        while True:
+            result = self.core.run(current, superpeers)
+            if result.winner is not None:
+                break
+            current = result.answered_by
+        self._log(f"{current.node_id} ({current.power_score}) → não há superpeer com power maior")
+        return current
+    
+    def announce(self, coordinator, superpeers: List) -> None:
+        targets = [sp for sp in superpeers if sp.node_id != coordinator.node_id]
+        self.core.announce(coordinator, targets)
+        if targets:
+            self.rounds += 1
+            self.elapsed_ms += self.latency_ms
+    
+    def outcome(self, coordinator) -> ElectionOutcome:
+        transport = self.transport
+        if not isinstance(transport, InMemoryTransport):
+            return super().outcome(coordinator)
+        return ElectionOutcome(
+            strategy=self.name,
+            coordinator=coordinator,
+            messages=sum(transport.messages.values()),
+            rounds=self.rounds + transport.exchanges,
+            latency_ms=self.elapsed_ms + transport.elapsed_ms
+        )
+
+
+class RingStrategy(ElectionStrategy):
+    """
+    Eleição em anel: ELECTION circula pelo anel (ordem da lista de
+    superpeers) acumulando os candidatos vivos; ao voltar ao iniciador o
+    mais forte é escolhido e COORDINATOR dá mais uma volta no anel.
+    """
+    name = "ring"
+    
+    def elect(self, initiator, superpeers: List):
+        if not superpeers:
+            return initiator
+        start = next((i for i, sp in enumerate(superpeers) if sp.node_id == initiator.node_id), 0)
+        ring = superpeers[start:] + superpeers[:start]
+        
+        collected = [initiator]
+        sender = initiator
+        for target in ring[1:]:
+            if self._hop("ELECTION", sender, target):
+                collected.append(target)
+                sender = target
+        # Fecha o anel de volta ao iniciador
+        if sender is not initiator:
+            self._hop("ELECTION", sender, initiator)
+        
+        self._live_ring = collected
+        winner = max(collected, key=rank)
+        self._log(f"{initiator.node_id} → anel completo, vencedor {winner.node_id} (power: {winner.power_score})")
+        return winner
+    
+    def announce(self, coordinator, superpeers: List) -> None:
+        # A mensagem já carrega os nós vivos: não há novos timeouts
+        live_ring = getattr(self, "_live_ring", [coordinator])
+        for sender, target in zip(live_ring, live_ring[1:]):
+            self._hop("COORDINATOR", sender, target)
+
+
+class ModifiedBullyStrategy(ElectionStrategy):
+    """
+    Bully modificado (convite): o iniciador conhece o power de todos e
+    desafia diretamente o superpeer mais forte; se ele não responder,
+    tenta o próximo da lista ordenada. Quem responde é o vencedor.
+    """
+    name = "modified-bully"
+    
+    def elect(self, initiator, superpeers: List):
+        stronger = sorted(
+            BullyElection.higher_candidates(initiator, superpeers),
+            key=rank, reverse=True
+        )
+        for target in stronger:
+            if self._exchange("ELECTION", initiator, target):
+                self._log(f"{target.node_id} → aceita o convite, é o mais forte ativo")
+                return target
+        self._log(f"{initiator.node_id} → nenhum superpeer mais forte ativo")
+        return initiator
+
+
+class TreeStrategy(ElectionStrategy):
+    """
+    Agregação do máximo em árvore: o iniciador é a raiz de uma árvore
+    binária sobre os superpeers; ELECTION desce nível a nível, cada nó
+    devolve o maior power da sua subárvore e COORDINATOR desce pela árvore.
+    Filhos de um nó falho são adotados pelo avô após o timeout.
+    """
+    name = "tree"
+    
+    def elect(self, initiator, superpeers: List):
+        order = [initiator] + [sp for sp in superpeers if sp.node_id != initiator.node_id]
+        self._order = order
+        best, latency, depth = self._collect(order, 0)
+        self.rounds += 2 * depth
+        self.elapsed_ms += latency
+        self._depth = depth
+        self._log(f"{initiator.node_id} → máximo agregado: {best.node_id} (power: {best.power_score})")
+        return best
+    
+    def _children(self, order: List, index: int) -> List[int]:
+        return [c for c in (2 * index + 1, 2 * index + 2) if c < len(order)]
+    
+    def _collect(self, order: List, index: int) -> Tuple[object, float, int]:
+        """Retorna (melhor nó, latência, profundidade) da subárvore de index."""
+        node = order[index]
+        best, latency, depth = node, 0.0, 0
+        for child in self._children(order, index):
+            child_best, child_latency, child_depth = self._probe(order, child)
+            if child_best is not None and rank(child_best) > rank(best):
+                best = child_best
+            latency = max(latency, child_latency)
+            depth = max(depth, child_depth)
+        return best, latency, depth
+    
+    def _probe(self, order: List, index: int) -> Tuple[Optional[object], float, int]:
+        """Envia ELECTION ao filho index e agrega a resposta."""
+        target = order[index]
+        self.messages["ELECTION"] += 1
+        if not _is_alive(target):
+            # Timeout: o pai adota os netos diretamente
+            best, latency, depth = None, 0.0, 0
+            for child in self._children(order, index):
+                child_best, child_latency, child_depth = self._probe(order, child)
+                if child_best is not None and (best is None or rank(child_best) > rank(best)):
+                    best = child_best
+                latency = max(latency, child_latency)
+                depth = max(depth, child_depth)
+            return best, self.timeout_ms + latency, depth
+        
+        self.messages["OK"] += 1
+        best, latency, depth = self._collect(order, index)
+        return best, 2 * self.latency_ms + latency, depth + 1
+    
+    def announce(self, coordinator, superpeers: List) -> None:
+        live = [sp for sp in getattr(self, "_order", superpeers)
+                if _is_alive(sp) and sp.node_id != coordinator.node_id]
+        depth = getattr(self, "_depth", 1)
+        self.messages["COORDINATOR"] += len(live)
+        self.rounds += depth
+        self.elapsed_ms += depth * self.latency_ms
+
+
+STRATEGIES = {
+    BullyStrategy.name: BullyStrategy,
+    RingStrategy.name: RingStrategy,
+    ModifiedBullyStrategy.name: ModifiedBullyStrategy,
+    TreeStrategy.name: TreeStrategy,
+}
+
+
+def create_strategy(name: str, **kwargs) -> ElectionStrategy:
+    """
+    Cria uma estratégia pelo nome.
+    
+    Args:
+        name: Um dos nomes em STRATEGIES
+        **kwargs: Parâmetros repassados ao construtor
+    
+    Returns:
+        Nova instância da estratégia
+    """
+    if name not in STRATEGIES:
+        raise ValueError(f"Estratégia desconhecida: {name} (opções: {', '.join(STRATEGIES)})")
+    return STRATEGIES[name](**kwargs)
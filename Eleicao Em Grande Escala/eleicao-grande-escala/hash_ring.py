@@ -0,0 +1,83 @@
+"""
+hash_ring.py - Anel de hash consistente com nós virtuais ponderados
+
+Usado pela liderança particionada: o espaço de chaves é dividido entre os
+superpeers ativos e cada chave tem como líder o dono do primeiro nó virtual
+no sentido horário. A quantidade de nós virtuais de cada superpeer é
+proporcional ao seu power_score, de modo que superpeers mais fortes lideram
+uma fatia maior. Quando um superpeer sai do anel, apenas as suas faixas
+passam para os sucessores; as demais chaves não mudam de líder.
+"""
+
+import hashlib
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+RING_SIZE = 1 << 64
+
+
+class ConsistentHashRing:
+    """
+    Anel de hash consistente.
+    
+    Attributes:
+        vnodes_per_power: Nós virtuais por ponto de power_score
+    """
+    
+    def __init__(self, vnodes_per_power: float = 1.0):
+        self.vnodes_per_power = vnodes_per_power
+        self._weights: Dict[str, int] = {}
+        self._hashes: List[int] = []
+        self._owners: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self._weights)
+    
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._weights
+    
+    def _vnodes(self, weight: int) -> int:
+        return max(1, round(weight * self.vnodes_per_power))
+    
+    def add(self, node_id: str, weight: int) -> None:
+        """Adiciona (ou repondera) um nó com peso weight."""
+        if node_id in self._weights:
+            self.remove(node_id)
+        self._weights[node_id] = weight
+        points = sorted(
+            list(zip(self._hashes, self._owners)) +
+            [(_hash(f"{node_id}#{i}"), node_id) for i in range(self._vnodes(weight))]
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [owner for _, owner in points]
+    
+    def remove(self, node_id: str) -> None:
+        """Remove o nó; suas faixas passam para os sucessores no anel."""
+        if self._weights.pop(node_id, None) is None:
+            return
+        points = [(h, owner) for h, owner in zip(self._hashes, self._owners) if owner != node_id]
+        self._hashes = [h for h, _ in points]
+        self._owners = [owner for _, owner in points]
+    
+    def owner(self, key: str) -> Optional[str]:
+        """Nó responsável pela chave (None se o anel estiver vazio)."""
+        if not self._hashes:
+            return None
+        index = bisect_right(self._hashes, _hash(key))
+        return self._owners[index % len(self._owners)]
+    
+    def ownership(self) -> Dict[str, float]:
+        """Fração do espaço de chaves de cada nó."""
+        shares = {node_id: 0.0 for node_id in self._weights}
+        if not self._hashes:
+            return shares
+        previous = self._hashes[-1] - RING_SIZE
+        for h, owner in zip(self._hashes, self._owners):
+            shares[owner] += (h - previous) / RING_SIZE
+            previous = h
+        return shares
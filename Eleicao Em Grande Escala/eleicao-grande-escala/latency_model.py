@@ -0,0 +1,93 @@
+"""
+latency_model.py - Latência simulada entre os nós do simulador
+
+Os nós são espalhados em regiões (clusters) de um plano 2D: o RTT entre dois
+nós é a distância entre eles mais o atraso de acesso de cada um, com um
+pequeno ruído por medição. As posições são determinísticas por node_id, o
+que permite comparar topologias diferentes sobre a mesma rede física.
+"""
+
+import math
+import random
+from typing import Dict, Iterable, Optional, Tuple
+
+from coordinates import VivaldiCoordinate
+
+
+class SimulatedLatency:
+    """
+    Modelo de RTT entre nós distribuídos em regiões.
+    
+    Attributes:
+        regions: Quantidade de regiões
+        spread_ms: Desvio padrão da posição dentro de uma região (ms)
+        area_ms: Lado da área onde os centros das regiões são sorteados (ms)
+        jitter: Ruído relativo de cada medição
+        seed: Semente do modelo
+    """
+    
+    def __init__(self, regions: int = 5, spread_ms: float = 6.0, area_ms: float = 150.0,
+                 jitter: float = 0.05, seed: int = 0):
+        self.regions = regions
+        self.spread_ms = spread_ms
+        self.area_ms = area_ms
+        self.jitter = jitter
+        self.seed = seed
+        rng = random.Random(seed)
+        self.centers = [(rng.uniform(0, area_ms), rng.uniform(0, area_ms)) for _ in range(regions)]
+        self._positions: Dict[str, Tuple[float, float, float]] = {}
+    
+    def position(self, node_id: str) -> Tuple[float, float, float]:
+        """Posição (x, y) e atraso de acesso do nó, fixos por node_id."""
+        position = self._positions.get(node_id)
+        if position is None:
+            rng = random.Random(f"{self.seed}:{node_id}")
+            cx, cy = rng.choice(self.centers)
+            position = (rng.gauss(cx, self.spread_ms), rng.gauss(cy, self.spread_ms), rng.uniform(0.5, 3.0))
+            self._positions[node_id] = position
+        return position
+    
+    def rtt(self, a: str, b: str, rng: Optional[random.Random] = None) -> float:
+        """
+        RTT (ms) entre os nós a e b.
+        
+        Args:
+            a, b: node_ids
+            rng: Se informado, aplica o ruído de medição (senão retorna o RTT base)
+        """
+        if a == b:
+            return 0.0
+        ax, ay, access_a = self.position(a)
+        bx, by, access_b = self.position(b)
+        base = math.hypot(ax - bx, ay - by) + access_a + access_b
+        if rng is None:
+            return base
+        return base * (1 + rng.uniform(-self.jitter, self.jitter))
+    
+    def learn_coordinates(self, node_ids: Iterable[str], rounds: int = 20, probes: int = 4,
+                          seed: int = 0) -> Dict[str, VivaldiCoordinate]:
+        """
+        Executa Vivaldi: a cada rodada, cada nó mede o RTT de alguns nós
+        sorteados (como nos heartbeats) e ajusta a própria coordenada.
+        
+        Args:
+            node_ids: Nós participantes
+            rounds: Quantidade de rodadas
+            probes: Medições por nó em cada rodada
+            seed: Semente das escolhas e do ruído
+        
+        Returns:
+            Coordenada aprendida por nó
+        """
+        rng = random.Random(seed)
+        ids = list(node_ids)
+        coordinates = {node_id: VivaldiCoordinate(rng=rng) for node_id in ids}
+        if len(ids) < 2:
+            return coordinates
+        for _ in range(rounds):
+            for node_id in ids:
+                for _ in range(probes):
+                    other = rng.choice(ids)
+                    if other != node_id:
+                        coordinates[node_id].update(self.rtt(node_id, other, rng), coordinates[other])
+        return coordinates
@@ -15,6 +15,10 @@ Este programa simula:
 import time
 import random
 from network_simulator import NetworkSimulator
+from latency_model import SimulatedLatency
+from hash_ring import ConsistentHashRing
+from profiling import profiler
+from election_core import rank
 
 
 def print_header():
@@ -149,6 +153,112 @@ def run_automatic_demo():
     print(f"   Coordenador final: {new_coordinator.node_id if new_coordinator else 'Nenhum'}")
 
 
+def run_comparison_demo():
+    """Compara as estratégias de eleição sobre a mesma topologia."""
+    print_header()
+    
+    print("\n📐 Comparação de algoritmos de eleição entre superpeers...")
+    
+    random.seed(42)
+    
+    simulator = NetworkSimulator(num_groups=10, peers_per_group=4)
+    simulator.create_network()
+    
+    print("\n" + "=" * 70)
+    print("   CENÁRIO 1: TODOS OS SUPERPEERS ATIVOS")
+    print("=" * 70)
+    simulator.print_strategy_comparison(simulator.compare_election_strategies())
+    
+    strongest = max(simulator.superpeers, key=rank)
+    print("\n" + "=" * 70)
+    print(f"   CENÁRIO 2: FALHA DO SUPERPEER MAIS FORTE ({strongest.node_id})")
+    print("=" * 70)
+    simulator.print_strategy_comparison(
+        simulator.compare_election_strategies(failures=[strongest.node_id])
+    )
+    
+    print("\n   Latência simulada: 10ms por salto, 1000ms de timeout por superpeer falho.")
+    print("\n✅ Comparação concluída!")
+
+
+def run_latency_demo():
+    """Compara grupos por ordem de criação com grupos formados por latência."""
+    print_header()
+    
+    print("\n🌐 Formação de grupos por latência (coordenadas Vivaldi)...")
+    
+    latency = SimulatedLatency(regions=6, seed=7)
+    results = []
+    for label, build in (("Ordem de criação", "create_network"),
+                         ("Por latência", "create_network_latency_aware")):
+        random.seed(42)
+        simulator = NetworkSimulator(num_groups=6, peers_per_group=5, latency=latency)
+        getattr(simulator, build)()
+        results.append((label, simulator.get_latency_stats()))
+    
+    print("\n" + "=" * 70)
+    print("   LATÊNCIA DENTRO DOS GRUPOS")
+    print("=" * 70)
+    print(f"\n   {'Formação':<20}{'RTT médio':>12}{'RTT máximo':>13}{'Failover local':>17}")
+    print("   " + "─" * 62)
+    for label, stats in results:
+        print(f"   {label:<20}{stats['rtt_medio_ms']:>10.1f}ms{stats['rtt_max_ms']:>11.1f}ms"
+              f"{stats['failover_local_ms']:>15.1f}ms")
+    
+    print("\n   Rede simulada: 6 regiões; RTT = distância + atraso de acesso dos nós.")
+    print("\n✅ Comparação concluída!")
+
+
+def run_sharding_demo():
+    """Compara o coordenador único com a liderança particionada por hash consistente."""
+    print_header()
+    
+    print("\n🔑 Liderança particionada por hash consistente...")
+    
+    random.seed(42)
+    simulator = NetworkSimulator(num_groups=10, peers_per_group=3)
+    simulator.create_network()
+    simulator.run_global_election()
+    
+    print("\n" + "=" * 70)
+    print("   VAZÃO DE OPERAÇÕES COORDENADAS")
+    print("=" * 70)
+    print(f"\n   {'Líderes':<28}{'Vazão (ops/s)':>16}{'Ganho':>10}")
+    print("   " + "─" * 54)
+    single = simulator.coordination_throughput()
+    print(f"   {'Coordenador único':<28}{single:>16,.0f}{1:>9.1f}x")
+    by_power = sorted(simulator.superpeers, key=rank, reverse=True)
+    for count in (2, 5, 10):
+        ring = ConsistentHashRing()
+        for sp in by_power[:count]:
+            ring.add(sp.node_id, sp.power_score)
+        throughput = simulator.coordination_throughput(ring=ring)
+        print(f"   {f'Anel com {count} superpeers':<28}{throughput:>16,.0f}{throughput / single:>9.1f}x")
+    
+    print("\n" + "=" * 70)
+    print("   FALHA DE UM SUPERPEER NO MODO PARTICIONADO")
+    print("=" * 70)
+    ring = simulator.enable_sharded_leadership()
+    keys = [f"op-{i}" for i in range(20_000)]
+    owners = {key: ring.owner(key) for key in keys}
+    
+    failed = by_power[0]
+    simulator.simulate_superpeer_failure(failed)
+    # Sem eleição global: apenas as faixas do superpeer falho mudam de líder
+    moved_share = simulator.election_manager.sync_ring()
+    changed = [key for key in keys if ring.owner(key) != owners[key]]
+    only_failed = all(owners[key] == failed.node_id for key in changed)
+    
+    print(f"\n   Espaço de chaves que mudou de líder: {moved_share:.1%}")
+    print(f"   Chaves amostradas que mudaram de líder: {len(changed)} de {len(keys)} "
+          f"({'todas' if only_failed else 'nem todas'} eram de {failed.node_id})")
+    print(f"   Eleições globais disparadas: 0 ({failed.node_id} era o coordenador global)"
+          if failed is simulator.election_manager.current_coordinator
+          else "   Eleições globais disparadas: 0")
+    
+    print("\n✅ Demonstração concluída!")
+
+
 def main():
     """Função principal."""
     print("\n" + "═" * 50)
@@ -156,15 +266,24 @@ def main():
     print("═" * 50)
     print("  [1] Modo Interativo (com pausas para explicação)")
     print("  [2] Modo Automático (execução direta)")
+    print("  [3] Comparação de algoritmos de eleição")
+    print("  [4] Formação de grupos por latência")
+    print("  [5] Liderança particionada (hash consistente)")
     print("═" * 50)
     
     try:
-        choice = input("\n  Digite sua escolha (1 ou 2): ").strip()
+        choice = input("\n  Digite sua escolha (1 a 5): ").strip()
         
         if choice == "1":
             run_interactive_demo()
         elif choice == "2":
             run_automatic_demo()
+        elif choice == "3":
+            run_comparison_demo()
+        elif choice == "4":
+            run_latency_demo()
+        elif choice == "5":
+            run_sharding_demo()
         else:
             print("  Opção inválida. Executando modo interativo...")
             run_interactive_demo()
@@ -174,6 +293,9 @@ def main():
     except Exception as e:
         print(f"\n  ❌ Erro: {e}")
         raise
+    finally:
+        if profiler.enabled:
+            print("\n" + profiler.summary())
 
 
 if __name__ == "__main__":
@@ -5,11 +5,58 @@ Este módulo simula uma rede distribuída de grande escala com
 arquitetura de Superpeers.
 """
 
+import os
 import random
-from typing import List, Tuple
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
 from node import Node, create_random_node
 from superpeer import Superpeer, elect_superpeer_from_group
 from election_manager import ElectionManager
+from election_core import rank
+from election_strategies import STRATEGIES, ElectionOutcome, create_strategy
+from topology_export import export_topology, summarize_network
+from network_stats import NetworkStats
+from rebalancer import GroupRebalancer, RebalanceReport
+from election_trace import FAIL, MEMBER, RECOVER, ROLE_CANDIDATE, ROLE_PEER, TraceRecorder
+from profiling import profiled, span
+from coordinates import cluster_by_coordinates
+from latency_model import SimulatedLatency
+from hash_ring import ConsistentHashRing
+
+
+def _group_powers(seed: int, group_id: int, peers_per_group: int,
+                  min_power: int, max_power: int) -> List[int]:
+    """Power scores de um grupo, determinísticos por (seed, group_id)."""
+    rng = random.Random(seed * 1_000_003 + group_id)
+    return rng.choices(range(min_power, max_power + 1), k=peers_per_group)
+
+
+def _build_shard(first_group_id: int, num_groups: int, peers_per_group: int,
+                 seed: int, min_power: int, max_power: int,
+                 first_peer_number: int) -> Tuple[int, bytes, bytes]:
+    """
+    Gera um intervalo de grupos e elege o superpeer local de cada um.
+    Executado em processos separados: retorna apenas o resultado compacto
+    por grupo (posição e power do superpeer); os peers podem ser recriados
+    depois a partir da semente do grupo.
+    
+    Returns:
+        (first_group_id, posições dos superpeers em array('H'), powers dos superpeers em array('H'))
+    """
+    leaders = array("H")
+    leader_powers = array("H")
+    for offset, group_id in enumerate(range(first_group_id, first_group_id + num_groups)):
+        powers = _group_powers(seed, group_id, peers_per_group, min_power, max_power)
+        # Mesmo critério de elect_superpeer_from_group: rank (power e, no
+        # empate, node_id) sobre os node_ids que o grupo terá
+        first_number = first_peer_number + offset * peers_per_group
+        top = max(powers)
+        tied = [i for i, power in enumerate(powers) if power == top]
+        best = max(tied, key=lambda i: f"P{first_number + i}")
+        leaders.append(best)
+        leader_powers.append(top)
+    return first_group_id, leaders.tobytes(), leader_powers.tobytes()
 
 
 class NetworkSimulator:
@@ -29,16 +76,31 @@ class NetworkSimulator:
         election_manager: Gerenciador de eleições
     """
     
-    def __init__(self, num_groups: int = 3, peers_per_group: int = 5):
+    def __init__(self, num_groups: int = 3, peers_per_group: int = 5,
+                 latency: Optional[SimulatedLatency] = None):
         self.num_groups = num_groups
         self.peers_per_group = peers_per_group
-        self.groups: List[List[Node]] = []
         self.superpeers: List[Superpeer] = []
         self.election_manager: ElectionManager = None
         
         # Contador para IDs de peers
         self.peer_counter = 1
+        
+        # Contadores atualizados pelos eventos da rede (leitura O(1))
+        self.stats = NetworkStats()
+        
+        # Modelo de latência opcional (formação de grupos por proximidade)
+        self.latency = latency
+        
+        # Gravação opcional da execução (ver enable_trace)
+        self.recorder: Optional[TraceRecorder] = None
+    
+    @property
+    def groups(self) -> List[List[Node]]:
+        """Grupos (superpeer seguido dos seus peers), derivados dos superpeers."""
+        return [[sp] + sp.peers for sp in self.superpeers]
     
+    @profiled()
     def create_network(self) -> None:
         """Cria a estrutura completa da rede."""
         print("\n" + "=" * 60)
@@ -50,15 +112,132 @@ class NetworkSimulator:
         # Cria grupos de peers
         for group_id in range(1, self.num_groups + 1):
             group = self.create_peer_group(group_id)
-            self.groups.append(group)
-            
-            # Elege superpeer do grupo
-            print(f"\nGrupo {group_id}: Peers [{', '.join(p.node_id for p in group)}]")
-            superpeer = elect_superpeer_from_group(group, group_id)
-            self.superpeers.append(superpeer)
+            self._add_group(group_id, group)
         
         # Inicializa o gerenciador de eleições
-        self.election_manager = ElectionManager(self.superpeers)
+        self.election_manager = ElectionManager(self.superpeers, recorder=self.recorder)
+    
+    def _add_group(self, group_id: int, group: List[Node]) -> None:
+        """Registra o grupo e elege seu superpeer (maior power)."""
+        print(f"\nGrupo {group_id}: Peers [{', '.join(p.node_id for p in group)}]")
+        superpeer = elect_superpeer_from_group(group, group_id)
+        self.superpeers.append(superpeer)
+        self.stats.add_group(superpeer)
+    
+    @profiled()
+    def create_network_latency_aware(self, rounds: int = 20, probes: int = 4, seed: int = 0) -> None:
+        """
+        Cria a rede agrupando peers próximos entre si.
+        
+        Os peers aprendem coordenadas Vivaldi medindo RTTs simulados com
+        alguns nós por rodada; os grupos são formados por k-means com
+        capacidade peers_per_group sobre as coordenadas e cada grupo elege o
+        superpeer de maior power, como em create_network.
+        
+        Args:
+            rounds: Rodadas de medição do Vivaldi
+            probes: Medições por peer em cada rodada
+            seed: Semente das medições e do agrupamento
+        """
+        if self.latency is None:
+            raise ValueError("Formação por latência requer um modelo de latência (latency=...)")
+        
+        print("\n" + "=" * 60)
+        print("     CRIAÇÃO DA REDE DISTRIBUÍDA (GRUPOS POR LATÊNCIA)")
+        print("=" * 60)
+        print(f"\nCriando rede com {self.num_groups} grupos e "
+              f"{self.num_groups * self.peers_per_group} peers total...")
+        
+        nodes = {}
+        for _ in range(self.num_groups * self.peers_per_group):
+            node = create_random_node(f"P{self.peer_counter}", min_power=10, max_power=100)
+            nodes[node.node_id] = node
+            self.peer_counter += 1
+        
+        coordinates = self.latency.learn_coordinates(nodes, rounds, probes, seed)
+        clusters = cluster_by_coordinates(coordinates, self.num_groups, self.peers_per_group, seed)
+        print(f"  → Coordenadas Vivaldi aprendidas em {rounds} rodadas "
+              f"(erro médio: {sum(c.error for c in coordinates.values()) / len(coordinates):.2f})")
+        
+        for group_id, members in enumerate(clusters, 1):
+            group = [nodes[node_id] for node_id in members]
+            for node in group:
+                node.group_id = group_id
+            self._add_group(group_id, group)
+        
+        self.election_manager = ElectionManager(self.superpeers, recorder=self.recorder)
+    
+    @profiled()
+    def create_network_parallel(self, workers: Optional[int] = None, shard_groups: int = 1000,
+                                seed: int = 0) -> None:
+        """
+        Cria a rede dividindo os grupos em shards construídos em paralelo.
+        
+        Cada shard (intervalo de grupos) é gerado e tem seus superpeers eleitos
+        em um processo separado, com semente determinística por grupo, de modo
+        que o resultado não depende da quantidade de workers nem do tamanho
+        dos shards. Os workers devolvem só o superpeer de cada grupo; o
+        processo principal cria os superpeers e os peers de cada grupo são
+        recriados da semente apenas quando a lista é acessada.
+        
+        Args:
+            workers: Quantidade de processos (padrão: número de CPUs)
+            shard_groups: Quantidade de grupos por shard
+            seed: Semente base da geração
+        """
+        print("\n" + "=" * 60)
+        print("     CRIAÇÃO DA REDE DISTRIBUÍDA (PARALELA)")
+        print("=" * 60)
+        
+        workers = workers or os.cpu_count() or 1
+        shards = [
+            (first, min(shard_groups, self.num_groups - first + 1), self.peers_per_group, seed, 10, 100,
+             self.peer_counter + (first - 1) * self.peers_per_group)
+            for first in range(1, self.num_groups + 1, shard_groups)
+        ]
+        print(f"\nCriando rede com {self.num_groups} grupos e "
+              f"{self.num_groups * self.peers_per_group} peers total "
+              f"({len(shards)} shards, {workers} workers)...")
+        
+        if workers > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_build_shard, *zip(*shards)))
+        else:
+            results = [_build_shard(*shard) for shard in shards]
+        
+        for first_group_id, leader_bytes, power_bytes in results:
+            leaders = array("H")
+            leaders.frombytes(leader_bytes)
+            powers = array("H")
+            powers.frombytes(power_bytes)
+            self._materialize_shard(first_group_id, leaders, powers, seed)
+        
+        self.election_manager = ElectionManager(self.superpeers, recorder=self.recorder)
+        print(f"  → {len(self.superpeers)} superpeers eleitos")
+    
+    def _materialize_shard(self, first_group_id: int, leaders: array, powers: array, seed: int) -> None:
+        """Cria os superpeers de um shard; os peers de cada grupo ficam para o primeiro acesso."""
+        size = self.peers_per_group
+        for offset, (leader, power) in enumerate(zip(leaders, powers)):
+            group_id = first_group_id + offset
+            first_number = self.peer_counter
+            superpeer = Superpeer(f"P{first_number + leader}", power, group_id,
+                                  peer_loader=self._peer_loader(group_id, first_number, leader, seed))
+            self.peer_counter += size
+            self.superpeers.append(superpeer)
+            self.stats.add_lazy_group(superpeer, size - 1)
+    
+    def _peer_loader(self, group_id: int, first_number: int, leader: int, seed: int):
+        """Recria os peers (exceto o superpeer) de um grupo gerado por _build_shard."""
+        def load() -> List[Node]:
+            powers = _group_powers(seed, group_id, self.peers_per_group, 10, 100)
+            superpeer_id = f"P{first_number + leader}"
+            return [
+                Node(f"P{first_number + i}", power, group_id=group_id,
+                     superpeer_id=superpeer_id, observer=self.stats)
+                for i, power in enumerate(powers) if i != leader
+            ]
+        return load
     
     def create_peer_group(self, group_id: int) -> List[Node]:
         """
@@ -79,6 +258,7 @@ class NetworkSimulator:
             self.peer_counter += 1
         return peers
     
+    @profiled()
     def run_global_election(self) -> Superpeer:
         """
         Executa eleição global entre superpeers.
@@ -91,7 +271,7 @@ class NetworkSimulator:
         print("=" * 60)
         
         # O superpeer com menor power inicia a eleição (simula detecção de necessidade)
-        initiator = min(self.superpeers, key=lambda sp: sp.power_score)
+        initiator = min(self.superpeers, key=rank)
         
         print(f"\n{initiator.node_id} (menor power) inicia a eleição...\n")
         
@@ -116,16 +296,125 @@ class NetworkSimulator:
         print("=" * 60)
         
         target.fail()
+        if self.recorder:
+            self.recorder.record(FAIL, target.node_id, power=target.power_score)
+    
+    def simulate_superpeer_recovery(self, superpeer: Superpeer) -> None:
+        """
+        Simula a recuperação de um superpeer falho.
+        
+        Args:
+            superpeer: Superpeer que volta a responder
+        """
+        superpeer.recover()
+        if self.recorder:
+            self.recorder.record(RECOVER, superpeer.node_id, power=superpeer.power_score)
+    
+    def enable_trace(self, path: str) -> TraceRecorder:
+        """
+        Ativa a gravação binária da execução (ver election_trace).
+        
+        Args:
+            path: Caminho do arquivo de trace
+        
+        Returns:
+            TraceRecorder em uso (feche com close() ao final)
+        """
+        self.recorder = TraceRecorder(path)
+        if self.election_manager:
+            self.election_manager.attach_recorder(self.recorder)
+        return self.recorder
+    
+    def add_superpeer(self, superpeer: Superpeer) -> None:
+        """Registra um superpeer criado depois da montagem da rede (ex.: divisão de grupo)."""
+        self.superpeers.append(superpeer)
+        self.stats.add_group(superpeer)
+        if self.recorder:
+            self.recorder.record(MEMBER, superpeer.node_id, power=superpeer.power_score,
+                                 role=ROLE_CANDIDATE)
     
-    def handle_failure_and_reelect(self) -> Superpeer:
+    def remove_superpeer(self, superpeer: Superpeer) -> None:
+        """Remove um superpeer cujo grupo já foi esvaziado (ex.: fusão de grupos)."""
+        self.superpeers.remove(superpeer)
+        self.stats.remove_group(superpeer)
+        if self.recorder:
+            # Rebaixado a par comum: deixa de ser candidato no replay
+            self.recorder.record(MEMBER, superpeer.node_id, power=superpeer.power_score,
+                                 role=ROLE_PEER)
+    
+    def on_groups_changed(self) -> None:
+        """Atualiza as estruturas derivadas depois de divisões ou fusões."""
+        self.num_groups = len(self.superpeers)
+        if self.election_manager:
+            self.election_manager.link_superpeers()
+    
+    def rebalance_groups(self, min_size: Optional[int] = None, max_size: Optional[int] = None,
+                         tolerance: int = 1) -> RebalanceReport:
+        """
+        Divide, funde e equilibra os grupos conforme a carga dos superpeers.
+        
+        Args:
+            min_size: Carga mínima antes da fusão (padrão: peers_per_group // 2)
+            max_size: Carga máxima antes da divisão (padrão: 2 * peers_per_group)
+            tolerance: Diferença máxima aceita entre cargas
+        
+        Returns:
+            RebalanceReport da rodada
+        """
+        print("\n" + "=" * 60)
+        print("     BALANCEAMENTO DE GRUPOS")
+        print("=" * 60)
+        
+        report = GroupRebalancer(self, min_size, max_size, tolerance).rebalance()
+        print(f"\n  Divisões: {len(report.splits)} | Fusões: {len(report.merges)} | "
+              f"Peers movidos: {report.moves} | Realocados de grupos falhos: {report.rehomed}")
+        return report
+    
+    def handle_failure_and_reelect(self) -> Optional[Superpeer]:
         """
         Detecta falha do coordenador e inicia re-eleição.
         
+        No modo particionado não há eleição global: apenas as faixas dos
+        superpeers falhos passam aos sucessores no anel.
+        
         Returns:
-            Novo coordenador eleito
+            Novo coordenador eleito (None no modo particionado)
         """
+        if self.election_manager.ring is not None:
+            self.election_manager.sync_ring()
+            return None
         return self.election_manager.handle_coordinator_failure()
     
+    def enable_sharded_leadership(self, vnodes_per_power: float = 1.0) -> ConsistentHashRing:
+        """Ativa a liderança particionada por hash consistente (ver ElectionManager)."""
+        return self.election_manager.enable_sharding(vnodes_per_power)
+    
+    def coordination_throughput(self, operations: int = 100_000,
+                                ring: Optional[ConsistentHashRing] = None) -> float:
+        """
+        Vazão simulada de operações coordenadas (operações/s).
+        
+        Cada superpeer processa power_score operações por ms simulado. Sem anel,
+        todas as operações passam pelo coordenador global; com anel, cada chave
+        vai ao seu líder e a vazão é limitada pelo líder mais carregado.
+        
+        Args:
+            operations: Quantidade de operações (chaves distintas)
+            ring: Anel a usar (padrão: o do ElectionManager, se ativo)
+        """
+        ring = ring or self.election_manager.ring
+        if ring is None:
+            coordinator = self.election_manager.current_coordinator
+            return coordinator.power_score * 1000.0 if coordinator else 0.0
+        
+        load: dict = {}
+        for i in range(operations):
+            owner = ring.owner(f"op-{i}")
+            load[owner] = load.get(owner, 0) + 1
+        index = {sp.node_id: sp for sp in self.superpeers}
+        makespan_ms = max(count / index[owner].power_score for owner, count in load.items())
+        return operations / makespan_ms * 1000.0
+    
     def visualize_network(self) -> None:
         """Exibe visualização ASCII da estrutura da rede."""
         coordinator = self.election_manager.current_coordinator
@@ -186,17 +475,121 @@ class NetworkSimulator:
         
         print("\n" + "=" * 60)
     
+    def compare_election_strategies(self, strategy_names: Optional[List[str]] = None,
+                                    failures: Optional[List[str]] = None,
+                                    latency_ms: float = 10.0,
+                                    timeout_ms: float = 1000.0) -> List[ElectionOutcome]:
+        """
+        Executa cada estratégia de eleição sobre a mesma topologia e o mesmo
+        roteiro de falhas, medindo mensagens, rodadas e latência simulada.
+        
+        Args:
+            strategy_names: Estratégias a comparar (todas por padrão)
+            failures: IDs dos superpeers que estarão falhos durante a eleição
+            latency_ms: Latência simulada de um salto de mensagem
+            timeout_ms: Tempo simulado de espera por um superpeer falho
+        
+        Returns:
+            Lista de ElectionOutcome, uma por estratégia
+        """
+        names = strategy_names or list(STRATEGIES)
+        failed_ids = set(failures or [])
+        saved = [(sp, sp.is_alive) for sp in self.superpeers]
+        results = []
+        
+        try:
+            for name in names:
+                # Restaura o estado original e aplica o mesmo roteiro de falhas
+                for sp, alive in saved:
+                    sp.is_alive = alive and sp.node_id not in failed_ids
+                
+                live = [sp for sp in self.superpeers if sp.is_alive]
+                if not live:
+                    break
+                initiator = min(live, key=rank)
+                
+                strategy = create_strategy(name, latency_ms=latency_ms, timeout_ms=timeout_ms)
+                with span(f"strategy.{name}"):
+                    results.append(strategy.run(initiator, self.superpeers))
+        finally:
+            for sp, alive in saved:
+                sp.is_alive = alive
+        
+        return results
+    
+    def print_strategy_comparison(self, results: List[ElectionOutcome]) -> None:
+        """Imprime tabela comparando as estratégias de eleição."""
+        print(f"\n   {'Estratégia':<16}{'Coordenador':<14}{'Mensagens':>10}{'Rodadas':>9}{'Latência':>12}")
+        print("   " + "─" * 61)
+        for outcome in results:
+            coord = outcome.coordinator.node_id if outcome.coordinator else "Nenhum"
+            print(f"   {outcome.strategy:<16}{coord:<14}{outcome.messages:>10}"
+                  f"{outcome.rounds:>9}{outcome.latency_ms:>10.1f}ms")
+    
+    def export_topology(self, path: str, fmt: str = "jsonl") -> int:
+        """
+        Exporta a topologia e o estado de eleição de forma incremental.
+        
+        Args:
+            path: Caminho do arquivo de saída
+            fmt: Formato ("jsonl", "dot" ou "csv")
+        
+        Returns:
+            Quantidade de nós exportados
+        """
+        return export_topology(self, path, fmt)
+    
+    def print_summary(self, top_k: int = 5) -> None:
+        """Imprime resumo agregado da rede (indicado para redes grandes)."""
+        print("\n" + summarize_network(self, top_k))
+    
+    def get_latency_stats(self) -> dict:
+        """
+        Mede a latência dentro dos grupos com o modelo de latência.
+        
+        O failover local estimado é o tempo da eleição Bully no grupo após a
+        detecção da falha do superpeer: o peer mais fraco envia ELECTION aos
+        mais fortes em paralelo (maior RTT) e o vencedor anuncia COORDINATOR
+        a todos (maior RTT/2). O timeout de detecção é igual nas duas formações
+        e fica de fora.
+        
+        Returns:
+            RTT médio e máximo peer→superpeer e failover local médio (ms)
+        """
+        if self.latency is None:
+            raise ValueError("Estatísticas de latência requerem um modelo de latência (latency=...)")
+        
+        rtt = self.latency.rtt
+        samples = []
+        failovers = []
+        for sp in self.superpeers:
+            members = [p for p in sp.peers if p.is_alive]
+            samples.extend(rtt(p.node_id, sp.node_id) for p in members)
+            if len(members) >= 2:
+                initiator = min(members, key=rank)
+                leader = max(members, key=rank)
+                ask = max(rtt(initiator.node_id, p.node_id) for p in members
+                          if rank(p) > rank(initiator))
+                announce = max(rtt(leader.node_id, p.node_id) for p in members if p is not leader)
+                failovers.append(ask + announce / 2)
+        
+        return {
+            "rtt_medio_ms": sum(samples) / len(samples) if samples else 0.0,
+            "rtt_max_ms": max(samples, default=0.0),
+            "failover_local_ms": sum(failovers) / len(failovers) if failovers else 0.0
+        }
+    
     def get_network_stats(self) -> dict:
-        """Retorna estatísticas da rede."""
-        total_peers = sum(1 + sp.get_peer_count() for sp in self.superpeers)
-        active_superpeers = sum(1 for sp in self.superpeers if sp.is_alive)
+        """Retorna estatísticas da rede (O(1), mantidas por NetworkStats)."""
+        stats = self.stats
+        coordinator = self.election_manager.current_coordinator if self.election_manager else None
         
         return {
-            "total_grupos": self.num_groups,
-            "total_peers": total_peers,
-            "superpeers_ativos": active_superpeers,
-            "coordenador": self.election_manager.current_coordinator.node_id 
-                          if self.election_manager.current_coordinator else "Nenhum"
+            "total_grupos": stats.total_groups,
+            "total_peers": stats.total_peers,
+            "peers_ativos": stats.live_peers,
+            "superpeers_ativos": stats.live_superpeers,
+            "coordenador": coordinator.node_id if coordinator else "Nenhum"
         }
     
     def print_stats(self) -> None:
@@ -204,6 +597,6 @@ class NetworkSimulator:
         stats = self.get_network_stats()
         print("\n📊 Estatísticas da Rede:")
         print(f"   • Total de grupos: {stats['total_grupos']}")
-        print(f"   • Total de peers: {stats['total_peers']}")
+        print(f"   • Total de peers: {stats['total_peers']} ({stats['peers_ativos']} ativos)")
         print(f"   • Superpeers ativos: {stats['superpeers_ativos']}")
         print(f"   • Coordenador global: {stats['coordenador']}")
@@ -0,0 +1,97 @@
+"""
+network_stats.py - Estatísticas da rede mantidas incrementalmente
+
+Em vez de percorrer todos os superpeers a cada leitura, os contadores são
+atualizados pelos próprios eventos da rede (falha, recuperação, entrada e
+saída de peers). As leituras são O(1) e podem ser feitas com alta frequência
+mesmo em redes muito grandes.
+"""
+
+from typing import Dict
+
+from node import Node
+from superpeer import Superpeer
+
+
+class NetworkStats:
+    """
+    Contadores da rede atualizados a cada evento.
+    
+    Os nós registrados recebem esta instância como observer e a notificam
+    em fail()/recover(); superpeers também notificam add_peer()/remove_peer().
+    
+    Attributes:
+        total_groups: Quantidade de grupos registrados
+        total_peers: Quantidade de nós (superpeers + peers)
+        live_peers: Quantidade de nós ativos
+        live_superpeers: Quantidade de superpeers ativos
+    """
+    
+    def __init__(self):
+        self.total_groups = 0
+        self.total_peers = 0
+        self.live_peers = 0
+        self.live_superpeers = 0
+        self._group_live: Dict[int, int] = {}
+    
+    def add_group(self, superpeer: Superpeer) -> None:
+        """Registra um grupo (superpeer e seus peers) já montado."""
+        self.total_groups += 1
+        self._group_live.setdefault(superpeer.group_id, 0)
+        self._track(superpeer, superpeer.group_id)
+        for peer in superpeer.peers:
+            self._track(peer, superpeer.group_id)
+    
+    def add_lazy_group(self, superpeer: Superpeer, peer_count: int) -> None:
+        """
+        Registra um grupo cujos peers ainda não foram criados.
+        
+        Os peers (todos ativos) são contados agora; quem os cria depois deve
+        atribuir este objeto como observer de cada um.
+        """
+        self.total_groups += 1
+        self._group_live.setdefault(superpeer.group_id, 0)
+        self._track(superpeer, superpeer.group_id)
+        self.total_peers += peer_count
+        self.live_peers += peer_count
+        self._group_live[superpeer.group_id] += peer_count
+    
+    def remove_group(self, superpeer: Superpeer) -> None:
+        """Remove um grupo já esvaziado (seus peers foram movidos antes)."""
+        superpeer.observer = None
+        self.total_groups -= 1
+        self.total_peers -= 1
+        if superpeer.is_alive:
+            self._adjust(superpeer, superpeer.group_id, -1)
+        self._group_live.pop(superpeer.group_id, None)
+    
+    def _track(self, node: Node, group_id: int) -> None:
+        node.observer = self
+        self.total_peers += 1
+        if node.is_alive:
+            self._adjust(node, group_id, 1)
+    
+    def _adjust(self, node: Node, group_id: int, delta: int) -> None:
+        self.live_peers += delta
+        self._group_live[group_id] = self._group_live.get(group_id, 0) + delta
+        if isinstance(node, Superpeer):
+            self.live_superpeers += delta
+    
+    def node_status_changed(self, node: Node, alive: bool) -> None:
+        """Chamado por Node.fail()/recover() quando o estado muda."""
+        self._adjust(node, node.group_id, 1 if alive else -1)
+    
+    def peer_added(self, superpeer: Superpeer, peer: Node) -> None:
+        """Chamado por Superpeer.add_peer()."""
+        self._track(peer, superpeer.group_id)
+    
+    def peer_removed(self, superpeer: Superpeer, peer: Node) -> None:
+        """Chamado por Superpeer.remove_peer()."""
+        peer.observer = None
+        self.total_peers -= 1
+        if peer.is_alive:
+            self._adjust(peer, superpeer.group_id, -1)
+    
+    def live_in_group(self, group_id: int) -> int:
+        """Quantidade de nós ativos do grupo (superpeer incluso)."""
+        return self._group_live.get(group_id, 0)
@@ -7,7 +7,7 @@ computacional (usado para eleições).
 """
 
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 
@@ -22,12 +22,14 @@ class Node:
         is_alive: Indica se o nó está ativo
         group_id: ID do grupo ao qual o nó pertence
         superpeer_id: ID do superpeer que coordena este nó
+        observer: Notificado quando o nó falha ou se recupera (ex.: NetworkStats)
     """
     node_id: str
     power_score: int
     is_alive: bool = True
     group_id: Optional[int] = None
     superpeer_id: Optional[str] = None
+    observer: Optional[object] = field(default=None, repr=False, compare=False)
     
     def __str__(self) -> str:
         status = "✓" if self.is_alive else "✗"
@@ -38,11 +40,15 @@ class Node:
     
     def fail(self) -> None:
         """Simula a falha do nó."""
+        if self.is_alive and self.observer:
+            self.observer.node_status_changed(self, False)
         self.is_alive = False
         print(f"  💥 {self.node_id} FALHOU!")
     
     def recover(self) -> None:
         """Simula a recuperação do nó."""
+        if not self.is_alive and self.observer:
+            self.observer.node_status_changed(self, True)
         self.is_alive = True
         print(f"  ♻️  {self.node_id} recuperado!")
 
@@ -0,0 +1,199 @@
+"""
+rebalancer.py - Divisão, fusão e balanceamento de carga dos grupos
+
+A carga de coordenação de um superpeer é a quantidade de peers ativos do seu
+grupo. Com falhas e entradas de peers, alguns superpeers ficam sobrecarregados
+enquanto outros quase não coordenam ninguém. O GroupRebalancer:
+
+1. Realoca os peers ativos de grupos cujo superpeer falhou
+2. Divide grupos acima de max_size, elegendo um superpeer para a nova metade
+3. Funde grupos abaixo de min_size (o superpeer volta a ser um peer comum)
+4. Move peers do grupo mais carregado para o menos carregado até a diferença
+   ficar dentro de tolerance
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from election_core import rank
+from node import Node
+from superpeer import Superpeer, elect_superpeer_from_group
+
+
+@dataclass
+class RebalanceReport:
+    """
+    Resumo de uma rodada de balanceamento.
+    
+    Attributes:
+        splits: IDs dos novos superpeers criados por divisão
+        merges: IDs dos superpeers rebaixados por fusão
+        moves: Quantidade de peers movidos entre grupos
+        rehomed: Peers ativos realocados de grupos com superpeer falho
+    """
+    splits: List[str] = field(default_factory=list)
+    merges: List[str] = field(default_factory=list)
+    moves: int = 0
+    rehomed: int = 0
+    
+    @property
+    def changed(self) -> bool:
+        return bool(self.splits or self.merges or self.moves or self.rehomed)
+
+
+class GroupRebalancer:
+    """
+    Mantém a carga dos superpeers dentro de limites configuráveis.
+    
+    Attributes:
+        simulator: NetworkSimulator cuja topologia é ajustada
+        min_size: Carga mínima (peers ativos) antes de fundir o grupo
+        max_size: Carga máxima antes de dividir o grupo
+        tolerance: Diferença máxima aceita entre a maior e a menor carga (mínimo 1)
+    """
+    
+    def __init__(self, simulator, min_size: Optional[int] = None, max_size: Optional[int] = None,
+                 tolerance: int = 1):
+        per_group = simulator.peers_per_group
+        self.simulator = simulator
+        self.min_size = max(1, per_group // 2) if min_size is None else min_size
+        self.max_size = max(2, per_group * 2) if max_size is None else max_size
+        # Com tolerância 0 um peer iria e voltaria entre dois grupos
+        self.tolerance = max(1, tolerance)
+        if self.max_size < 2 * self.min_size:
+            raise ValueError("max_size deve ser pelo menos 2 * min_size (metades de uma divisão "
+                             "não podem ficar abaixo do mínimo)")
+    
+    @staticmethod
+    def load(superpeer: Superpeer) -> int:
+        """Carga de coordenação: peers ativos do grupo."""
+        return sum(1 for peer in superpeer.peers if peer.is_alive)
+    
+    def _coordinator(self) -> Optional[Superpeer]:
+        manager = self.simulator.election_manager
+        return manager.current_coordinator if manager else None
+    
+    def _live_superpeers(self) -> List[Superpeer]:
+        return [sp for sp in self.simulator.superpeers if sp.is_alive]
+    
+    def _move(self, peer: Node, source: Superpeer, target: Superpeer) -> None:
+        source.remove_peer(peer)
+        target.add_peer(peer)
+    
+    def rebalance(self) -> RebalanceReport:
+        """
+        Executa uma rodada completa de balanceamento.
+        
+        Returns:
+            RebalanceReport com as divisões, fusões e movimentações feitas
+        """
+        report = RebalanceReport()
+        if not self._live_superpeers():
+            return report
+        
+        self._rehome_orphans(report)
+        self._split_overloaded(report)
+        self._merge_undersized(report)
+        self._even_out(report)
+        
+        if report.splits or report.merges:
+            self.simulator.on_groups_changed()
+        return report
+    
+    def _rehome_orphans(self, report: RebalanceReport) -> None:
+        """Realoca os peers ativos de grupos cujo superpeer falhou."""
+        live = self._live_superpeers()
+        heap = [(self.load(sp), i, sp) for i, sp in enumerate(live)]
+        heapq.heapify(heap)
+        for sp in self.simulator.superpeers:
+            if sp.is_alive:
+                continue
+            for peer in [p for p in sp.peers if p.is_alive]:
+                load, i, target = heapq.heappop(heap)
+                self._move(peer, sp, target)
+                heapq.heappush(heap, (load + 1, i, target))
+                report.rehomed += 1
+    
+    def _split_overloaded(self, report: RebalanceReport) -> None:
+        """Divide grupos acima de max_size até todos ficarem dentro do limite."""
+        pending = [sp for sp in self._live_superpeers() if self.load(sp) > self.max_size]
+        next_group = max(sp.group_id for sp in self.simulator.superpeers) + 1
+        while pending:
+            superpeer = pending.pop()
+            live = sorted((p for p in superpeer.peers if p.is_alive), key=rank, reverse=True)
+            # Posições alternadas: as duas metades ficam com força parecida
+            half = live[1::2]
+            for peer in half:
+                superpeer.remove_peer(peer)
+            
+            print(f"\n  ✂️  Grupo {superpeer.group_id} sobrecarregado ({len(live)} peers) → "
+                  f"novo grupo {next_group}")
+            new_superpeer = elect_superpeer_from_group(half, next_group)
+            self.simulator.add_superpeer(new_superpeer)
+            report.splits.append(new_superpeer.node_id)
+            next_group += 1
+            
+            for sp in (superpeer, new_superpeer):
+                if self.load(sp) > self.max_size:
+                    pending.append(sp)
+    
+    def _merge_undersized(self, report: RebalanceReport) -> None:
+        """Funde grupos abaixo de min_size nos grupos menos carregados."""
+        coordinator = self._coordinator()
+        for superpeer in sorted(self._live_superpeers(), key=self.load):
+            live = self._live_superpeers()
+            if len(live) <= 1 or self.load(superpeer) >= self.min_size:
+                continue
+            if superpeer is coordinator:
+                continue
+            
+            members = list(superpeer.peers)
+            demoted = Node(superpeer.node_id, superpeer.power_score, superpeer.is_alive)
+            incoming = sum(1 for p in members if p.is_alive) + 1
+            targets = [sp for sp in live if sp is not superpeer]
+            if sum(self.max_size - self.load(sp) for sp in targets) < incoming:
+                continue
+            
+            print(f"\n  🔗 Grupo {superpeer.group_id} com poucos peers ({self.load(superpeer)}) → fundindo")
+            heap = [(self.load(sp), i, sp) for i, sp in enumerate(targets)]
+            heapq.heapify(heap)
+            for peer in [demoted] + members:
+                load, i, target = heapq.heappop(heap)
+                if peer is not demoted:
+                    superpeer.remove_peer(peer)
+                target.add_peer(peer)
+                heapq.heappush(heap, (load + peer.is_alive, i, target))
+            self.simulator.remove_superpeer(superpeer)
+            report.merges.append(superpeer.node_id)
+    
+    def _even_out(self, report: RebalanceReport) -> None:
+        """Move peers do grupo mais carregado para o menos carregado."""
+        live = self._live_superpeers()
+        if len(live) < 2:
+            return
+        low = [(self.load(sp), i, sp) for i, sp in enumerate(live)]
+        high = [(-load, i, sp) for load, i, sp in low]
+        heapq.heapify(low)
+        heapq.heapify(high)
+        loads = {i: load for load, i, _ in low}
+        
+        while True:
+            # Descarta entradas desatualizadas dos dois heaps
+            while -high[0][0] != loads[high[0][1]]:
+                heapq.heappop(high)
+            while low[0][0] != loads[low[0][1]]:
+                heapq.heappop(low)
+            
+            _, hi, source = high[0]
+            _, li, target = low[0]
+            if loads[hi] - loads[li] <= self.tolerance:
+                break
+            
+            peer = next(p for p in reversed(source.peers) if p.is_alive)
+            self._move(peer, source, target)
+            report.moves += 1
+            loads[hi] -= 1
+            loads[li] += 1
+            heapq.heappush(high, (-loads[hi], hi, source))
+            heapq.heappush(low, (loads[li], li, target))
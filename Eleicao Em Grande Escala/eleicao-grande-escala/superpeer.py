@@ -5,8 +5,9 @@ Este módulo define a classe Superpeer que herda de Node e adiciona
 funcionalidades de coordenação de grupo e participação em eleições globais.
 """
 
-from typing import List, Optional
+from typing import Callable, List, Optional
 from node import Node
+from election_core import rank
 
 
 class Superpeer(Node):
@@ -19,18 +20,43 @@ class Superpeer(Node):
     - Detectam falhas de outros superpeers
     
     Attributes:
-        peers: Lista de peers sob coordenação deste superpeer
-        other_superpeers: Referência a outros superpeers na rede
+        peers: Lista de peers sob coordenação deste superpeer (criada no
+            primeiro acesso quando há peer_loader)
+        other_superpeers: Outros superpeers da rede (calculado a partir da
+            lista compartilhada superpeer_directory)
         is_global_coordinator: Indica se é o coordenador global atual
     """
     
-    def __init__(self, node_id: str, power_score: int, group_id: int):
+    def __init__(self, node_id: str, power_score: int, group_id: int,
+                 peer_loader: Optional[Callable[[], List[Node]]] = None):
         super().__init__(node_id=node_id, power_score=power_score, 
                         is_alive=True, group_id=group_id)
-        self.peers: List[Node] = []
-        self.other_superpeers: List['Superpeer'] = []
+        self._peers: Optional[List[Node]] = None if peer_loader else []
+        self._peer_loader = peer_loader
+        self.superpeer_directory: List['Superpeer'] = []
         self.is_global_coordinator: bool = False
     
+    @property
+    def peers(self) -> List[Node]:
+        if self._peers is None:
+            self._peers = self._peer_loader()
+            self._peer_loader = None
+        return self._peers
+    
+    @peers.setter
+    def peers(self, peers: List[Node]) -> None:
+        self._peers = peers
+        self._peer_loader = None
+    
+    @property
+    def other_superpeers(self) -> List['Superpeer']:
+        return [s for s in self.superpeer_directory if s.node_id != self.node_id]
+    
+    @property
+    def peers_loaded(self) -> bool:
+        """Indica se a lista de peers já foi criada."""
+        return self._peers is not None
+    
     def __str__(self) -> str:
         status = "✓" if self.is_alive else "✗"
         coord = " ★COORD" if self.is_global_coordinator else ""
@@ -41,12 +67,16 @@ class Superpeer(Node):
         peer.superpeer_id = self.node_id
         peer.group_id = self.group_id
         self.peers.append(peer)
+        if self.observer:
+            self.observer.peer_added(self, peer)
     
     def remove_peer(self, peer: Node) -> None:
         """Remove um peer do grupo."""
         if peer in self.peers:
             self.peers.remove(peer)
             peer.superpeer_id = None
+            if self.observer:
+                self.observer.peer_removed(self, peer)
     
     def set_as_coordinator(self) -> None:
         """Define este superpeer como coordenador global."""
@@ -89,8 +119,8 @@ def elect_superpeer_from_group(peers: List[Node], group_id: int) -> Superpeer:
     if not peers:
         raise ValueError("Grupo vazio - não é possível eleger superpeer")
     
-    # Encontra o peer com maior power_score
-    best_peer = max(peers, key=lambda p: p.power_score)
+    # Encontra o peer de maior rank (power_score e, no empate, node_id)
+    best_peer = max(peers, key=rank)
     
     # Cria Superpeer a partir do peer eleito
     superpeer = Superpeer(
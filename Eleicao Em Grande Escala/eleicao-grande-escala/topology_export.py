@@ -0,0 +1,171 @@
+"""
+topology_export.py - Exportação escalável da topologia da rede
+
+Este módulo grava a topologia e o estado de eleição do simulador em arquivos
+de forma incremental (um nó por vez), sem montar strings gigantes em memória:
+
+- JSON Lines: um objeto JSON por nó
+- GraphViz DOT: coordenador → superpeers → peers
+- CSV compacto: uma linha por nó
+
+Também oferece um resumo textual agregado (tamanho dos grupos e top-k
+superpeers) adequado para redes com milhões de nós.
+"""
+
+import csv
+import heapq
+import json
+from typing import Iterator, TextIO
+
+from election_core import rank
+
+
+CSV_FIELDS = ["node_id", "role", "group_id", "power_score", "is_alive", "superpeer_id"]
+
+
+def iter_nodes(simulator) -> Iterator[dict]:
+    """
+    Percorre todos os nós da rede, superpeer seguido dos peers do grupo.
+    
+    Args:
+        simulator: NetworkSimulator com a rede criada
+    
+    Yields:
+        Um dicionário por nó com id, papel, grupo, power e estado
+    """
+    coordinator = simulator.election_manager.current_coordinator if simulator.election_manager else None
+    coordinator_id = coordinator.node_id if coordinator else None
+    
+    for sp in simulator.superpeers:
+        yield {
+            "node_id": sp.node_id,
+            "role": "coordinator" if sp.node_id == coordinator_id else "superpeer",
+            "group_id": sp.group_id,
+            "power_score": sp.power_score,
+            "is_alive": sp.is_alive,
+            "superpeer_id": coordinator_id
+        }
+        for peer in sp.peers:
+            yield {
+                "node_id": peer.node_id,
+                "role": "peer",
+                "group_id": peer.group_id,
+                "power_score": peer.power_score,
+                "is_alive": peer.is_alive,
+                "superpeer_id": sp.node_id
+            }
+
+
+def write_jsonl(simulator, out: TextIO) -> int:
+    """Grava um objeto JSON por linha; retorna a quantidade de nós."""
+    count = 0
+    for record in iter_nodes(simulator):
+        out.write(json.dumps(record, separators=(",", ":")))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_dot(simulator, out: TextIO) -> int:
+    """Grava o grafo coordenador → superpeers → peers no formato DOT."""
+    out.write("digraph network {\n")
+    out.write("  node [shape=circle];\n")
+    count = 0
+    for record in iter_nodes(simulator):
+        node_id = record["node_id"]
+        style = "" if record["is_alive"] else ", style=dashed"
+        if record["role"] == "coordinator":
+            shape = "doublecircle"
+        elif record["role"] == "superpeer":
+            shape = "box"
+        else:
+            shape = "circle"
+        out.write(f'  "{node_id}" [shape={shape}, label="{node_id}\\n{record["power_score"]}"{style}];\n')
+        parent = record["superpeer_id"]
+        if parent and parent != node_id:
+            out.write(f'  "{parent}" -> "{node_id}";\n')
+        count += 1
+    out.write("}\n")
+    return count
+
+
+def write_csv(simulator, out: TextIO) -> int:
+    """Grava uma linha CSV por nó; retorna a quantidade de nós."""
+    writer = csv.writer(out)
+    writer.writerow(CSV_FIELDS)
+    count = 0
+    for record in iter_nodes(simulator):
+        writer.writerow([
+            record["node_id"], record["role"], record["group_id"],
+            record["power_score"], int(record["is_alive"]), record["superpeer_id"] or ""
+        ])
+        count += 1
+    return count
+
+
+WRITERS = {
+    "jsonl": write_jsonl,
+    "dot": write_dot,
+    "csv": write_csv,
+}
+
+
+def export_topology(simulator, path: str, fmt: str = "jsonl") -> int:
+    """
+    Exporta a topologia para um arquivo, gravando nó a nó.
+    
+    Args:
+        simulator: NetworkSimulator com a rede criada
+        path: Caminho do arquivo de saída
+        fmt: Formato ("jsonl", "dot" ou "csv")
+    
+    Returns:
+        Quantidade de nós exportados
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Formato desconhecido: {fmt} (opções: {', '.join(WRITERS)})")
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        return WRITERS[fmt](simulator, out)
+
+
+def summarize_network(simulator, top_k: int = 5) -> str:
+    """
+    Gera um resumo agregado da rede em uma única passada.
+    
+    Args:
+        simulator: NetworkSimulator com a rede criada
+        top_k: Quantidade de superpeers mais fortes listados
+    
+    Returns:
+        Texto curto com agregados por grupo e os top-k superpeers
+    """
+    groups = 0
+    total_nodes = 0
+    alive_nodes = 0
+    failed_superpeers = 0
+    min_size = None
+    max_size = 0
+    
+    for sp in simulator.superpeers:
+        size = 1 + len(sp.peers)
+        groups += 1
+        total_nodes += size
+        alive_nodes += sp.is_alive + sum(1 for p in sp.peers if p.is_alive)
+        failed_superpeers += not sp.is_alive
+        min_size = size if min_size is None else min(min_size, size)
+        max_size = max(max_size, size)
+    
+    top = heapq.nlargest(top_k, simulator.superpeers, key=rank)
+    coordinator = simulator.election_manager.current_coordinator if simulator.election_manager else None
+    
+    lines = [
+        f"Grupos: {groups} | Nós: {total_nodes} | Ativos: {alive_nodes}",
+        f"Tamanho dos grupos: min {min_size or 0} / média {total_nodes / groups if groups else 0:.1f} / max {max_size}",
+        f"Superpeers falhos: {failed_superpeers}",
+        f"Coordenador: {coordinator.node_id if coordinator else 'Nenhum'}",
+        f"Top {len(top)} superpeers:"
+    ]
+    for sp in top:
+        status = "✓" if sp.is_alive else "✗"
+        lines.append(f"  [{status}] {sp.node_id} (grupo {sp.group_id}, power: {sp.power_score}, peers: {len(sp.peers)})")
+    return "\n".join(lines)